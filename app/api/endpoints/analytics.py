@@ -1,44 +1,44 @@
 from fastapi import APIRouter, HTTPException
-from typing import Dict, Any
+import asyncio
+from typing import Dict, Any, Optional
 from datetime import datetime, timedelta
+from fastapi_cache.decorator import cache
 
 from app.models.analytics import AnalyticsResponse, DocumentAnalytics, QueryAnalytics
 from app.core.database import get_database
+from app.core.cache import ANALYTICS_NAMESPACE, analytics_key_builder
+from app.core.config import settings
+from app.services.stats_service import STATS_COLLECTION, stats_service
 import logging
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
 @router.get("/", response_model=AnalyticsResponse)
+@cache(expire=settings.ANALYTICS_CACHE_EXPIRE, namespace=ANALYTICS_NAMESPACE, key_builder=analytics_key_builder)
 async def get_analytics():
     """Get comprehensive system analytics"""
     
     try:
-        database = await get_database()
+        database = get_database()
         
-        # Count documents and queries
-        doc_count = await database.documents.count_documents({})
-        query_count = await database.queries.count_documents({})
-        
-        # Get popular topics (based on document categories)
-        popular_topics = await _get_popular_topics(database)
-        
-        # Get recent activity
-        recent_activity = await _get_recent_activity(database)
-        
-        # Get performance metrics
-        performance_metrics = await _get_performance_metrics(database)
-        
-        # Get usage statistics
-        usage_statistics = await _get_usage_statistics(database)
+        # Totals come from collection metadata, averages and 24h counts from
+        # the hourly roll-up; all lookups are independent so they run concurrently
+        doc_count, query_count, popular_topics, recent_activity, rollups = await asyncio.gather(
+            database.documents.estimated_document_count(),
+            database.queries.estimated_document_count(),
+            _get_popular_topics(database),
+            _get_recent_activity(database),
+            _get_rollups(database)
+        )
         
         return AnalyticsResponse(
             total_documents=doc_count,
             total_queries=query_count,
             popular_topics=popular_topics,
             recent_activity=recent_activity,
-            performance_metrics=performance_metrics,
-            usage_statistics=usage_statistics
+            performance_metrics=_get_performance_metrics(rollups),
+            usage_statistics=_get_usage_statistics(rollups)
         )
         
     except Exception as e:
@@ -46,32 +46,38 @@ async def get_analytics():
         raise HTTPException(status_code=500, detail="Failed to get analytics")
 
 @router.get("/documents", response_model=Dict[str, Any])
+@cache(expire=settings.ANALYTICS_CACHE_EXPIRE, namespace=ANALYTICS_NAMESPACE, key_builder=analytics_key_builder)
 async def get_document_analytics():
     """Get document-specific analytics"""
     
     try:
-        database = await get_database()
+        database = get_database()
         
-        # Get document analytics
-        pipeline = [
-            {
-                "$group": {
-                    "_id": "$content_type",
-                    "count": {"$sum": 1},
-                    "avg_chunk_count": {"$avg": "$chunk_count"},
-                    "total_size": {"$sum": "$file_size"}
+        doc_facets = {
+            "document_types": [
+                {
+                    "$group": {
+                        "_id": "$content_type",
+                        "count": {"$sum": 1},
+                        "avg_chunk_count": {"$avg": "$chunk_count"},
+                        "total_size": {"$sum": "$file_size"}
+                    }
                 }
-            }
-        ]
+            ],
+            "processing_status": [
+                {"$group": {"_id": "$status", "count": {"$sum": 1}}}
+            ]
+        }
         
-        doc_stats = []
-        async for stat in database.documents.aggregate(pipeline):
-            doc_stats.append(stat)
+        doc_count, doc_stats = await asyncio.gather(
+            database.documents.estimated_document_count(),
+            _run_facets(database.documents, doc_facets)
+        )
         
         return {
-            "document_types": doc_stats,
-            "total_documents": await database.documents.count_documents({}),
-            "processing_status": await _get_processing_status(database)
+            "document_types": doc_stats["document_types"],
+            "total_documents": doc_count,
+            "processing_status": _get_processing_status(doc_stats)
         }
         
     except Exception as e:
@@ -79,31 +85,23 @@ async def get_document_analytics():
         raise HTTPException(status_code=500, detail="Failed to get document analytics")
 
 @router.get("/queries", response_model=QueryAnalytics)
+@cache(expire=settings.ANALYTICS_CACHE_EXPIRE, namespace=ANALYTICS_NAMESPACE, key_builder=analytics_key_builder)
 async def get_query_analytics():
     """Get query-specific analytics"""
     
     try:
-        database = await get_database()
-        
-        # Calculate query analytics
-        total_queries = await database.queries.count_documents({})
-        
-        # Average response time
-        pipeline = [
-            {"$group": {"_id": None, "avg_response_time": {"$avg": "$processing_time"}}}
-        ]
-        avg_time_result = await database.queries.aggregate(pipeline).to_list(1)
-        avg_response_time = avg_time_result[0]["avg_response_time"] if avg_time_result else 0.0
+        database = get_database()
         
-        # Success rate (confidence > 0.5)
-        high_confidence_queries = await database.queries.count_documents({"confidence": {"$gt": 0.5}})
-        success_rate = (high_confidence_queries / total_queries * 100) if total_queries > 0 else 0.0
-        
-        # Popular questions
-        popular_questions = await _get_popular_questions(database)
+        # Totals, success count and response time come from running counters
+        counters, popular_questions, query_trends = await asyncio.gather(
+            stats_service.get_query_counters(),
+            _get_popular_questions(database),
+            _get_query_trends(database)
+        )
         
-        # Query trends
-        query_trends = await _get_query_trends(database)
+        total_queries = counters["total"]
+        avg_response_time = (counters["sum_time"] / total_queries) if total_queries > 0 else 0.0
+        success_rate = (counters["high_conf"] / total_queries * 100) if total_queries > 0 else 0.0
         
         return QueryAnalytics(
             total_queries=total_queries,
@@ -118,9 +116,17 @@ async def get_query_analytics():
         raise HTTPException(status_code=500, detail="Failed to get query analytics")
 
 # Helper functions
+async def _run_facets(collection, facets: dict) -> dict:
+    """Run several sub-pipelines over a collection in a single aggregation"""
+    result = await collection.aggregate([{"$facet": facets}]).to_list(1)
+    return result[0] if result else {name: [] for name in facets}
+
 async def _get_popular_topics(database) -> list:
     """Get popular topics based on document categories"""
     pipeline = [
+        # Skip untagged documents before unwinding
+        {"$match": {"metadata.tags": {"$exists": True, "$ne": []}}},
+        {"$project": {"metadata.tags": 1}},
         {"$unwind": "$metadata.tags"},
         {"$group": {"_id": "$metadata.tags", "count": {"$sum": 1}}},
         {"$sort": {"count": -1}},
@@ -135,87 +141,90 @@ async def _get_popular_topics(database) -> list:
 
 async def _get_recent_activity(database) -> list:
     """Get recent activity (queries and uploads)"""
-    recent_queries = database.queries.find({}).sort("timestamp", -1).limit(5)
-    recent_docs = database.documents.find({}).sort("upload_date", -1).limit(5)
-    
-    activity = []
-    
-    async for query in recent_queries:
-        activity.append({
-            "type": "query",
-            "description": query["question"][:50] + "...",
-            "timestamp": query["timestamp"]
-        })
-    
-    async for doc in recent_docs:
-        activity.append({
-            "type": "upload",
-            "description": f"Uploaded {doc['filename']}",
-            "timestamp": doc["upload_date"]
-        })
+    # Each side takes its newest entries off its timestamp index before the
+    # union, so only the final merge sort runs in memory
+    pipeline = [
+        {"$sort": {"timestamp": -1}},
+        {"$limit": 10},
+        {"$project": {
+            "_id": 0,
+            "type": {"$literal": "query"},
+            "description": {"$concat": [{"$substrCP": ["$question", 0, 50]}, "..."]},
+            "timestamp": "$timestamp"
+        }},
+        {"$unionWith": {
+            "coll": "documents",
+            "pipeline": [
+                {"$sort": {"upload_date": -1}},
+                {"$limit": 10},
+                {"$project": {
+                    "_id": 0,
+                    "type": {"$literal": "upload"},
+                    "description": {"$concat": ["Uploaded ", "$filename"]},
+                    "timestamp": "$upload_date"
+                }}
+            ]
+        }},
+        {"$sort": {"timestamp": -1}},
+        {"$limit": 10}
+    ]
     
-    # Sort by timestamp
-    activity.sort(key=lambda x: x["timestamp"], reverse=True)
-    return activity[:10]
+    return await database.queries.aggregate(pipeline).to_list(10)
 
-async def _get_performance_metrics(database) -> dict:
-    """Get system performance metrics"""
-    # Average processing time for documents
-    doc_pipeline = [
-        {"$group": {"_id": None, "avg_processing_time": {"$avg": "$processing_time"}}}
+async def _get_rollups(database) -> dict:
+    """Get per-collection totals from the hourly roll-up"""
+    since = datetime.utcnow() - timedelta(hours=24)
+    pipeline = [
+        {"$group": {
+            "_id": "$source",
+            "count": {"$sum": "$count"},
+            "total_processing_time": {"$sum": "$total_processing_time"},
+            "timed_count": {"$sum": "$timed_count"},
+            "last_24h": {"$sum": {"$cond": [{"$gte": ["$hour", since]}, "$count", 0]}}
+        }}
     ]
-    doc_result = await database.documents.aggregate(doc_pipeline).to_list(1)
-    avg_doc_processing = doc_result[0]["avg_processing_time"] if doc_result else 0.0
     
-    # Average query response time
-    query_pipeline = [
-        {"$group": {"_id": None, "avg_response_time": {"$avg": "$processing_time"}}}
-    ]
-    query_result = await database.queries.aggregate(query_pipeline).to_list(1)
-    avg_query_response = query_result[0]["avg_response_time"] if query_result else 0.0
+    rollups = {}
+    async for rollup in database[STATS_COLLECTION].aggregate(pipeline):
+        rollups[rollup["_id"]] = rollup
     
+    return rollups
+
+def _average_processing_time(rollup: Optional[dict]) -> float:
+    """Average processing time over a roll-up entry"""
+    if not rollup or not rollup["timed_count"]:
+        return 0.0
+    return rollup["total_processing_time"] / rollup["timed_count"]
+
+def _get_performance_metrics(rollups: dict) -> dict:
+    """Get system performance metrics"""
     return {
-        "avg_document_processing_time": avg_doc_processing,
-        "avg_query_response_time": avg_query_response,
+        "avg_document_processing_time": _average_processing_time(rollups.get("documents")),
+        "avg_query_response_time": _average_processing_time(rollups.get("queries")),
         "system_uptime": "99.9%"  # Placeholder
     }
 
-async def _get_usage_statistics(database) -> dict:
+def _get_usage_statistics(rollups: dict) -> dict:
     """Get usage statistics"""
-    now = datetime.utcnow()
-    
-    # Queries in last 24 hours
-    queries_24h = await database.queries.count_documents({
-        "timestamp": {"$gte": now - timedelta(hours=24)}
-    })
-    
-    # Documents uploaded in last 24 hours
-    docs_24h = await database.documents.count_documents({
-        "upload_date": {"$gte": now - timedelta(hours=24)}
-    })
-    
     return {
-        "queries_last_24h": queries_24h,
-        "documents_last_24h": docs_24h,
+        "queries_last_24h": rollups.get("queries", {}).get("last_24h", 0),
+        "documents_last_24h": rollups.get("documents", {}).get("last_24h", 0),
         "peak_usage_hour": "14:00"  # Placeholder
     }
 
-async def _get_processing_status(database) -> dict:
+def _get_processing_status(doc_stats: dict) -> dict:
     """Get document processing status distribution"""
-    pipeline = [
-        {"$group": {"_id": "$status", "count": {"$sum": 1}}}
-    ]
-    
-    status_dist = {}
-    async for status in database.documents.aggregate(pipeline):
-        status_dist[status["_id"]] = status["count"]
-    
-    return status_dist
+    return {
+        status["_id"]: status["count"]
+        for status in doc_stats["processing_status"]
+    }
 
 async def _get_popular_questions(database) -> list:
     """Get popular question patterns"""
     # This is a simplified version - in production you'd use NLP to group similar questions
-    recent_queries = database.queries.find({}).sort("timestamp", -1).limit(50)
+    recent_queries = database.queries.find(
+        {}, {"_id": 0, "question": 1, "confidence": 1, "timestamp": 1}
+    ).sort("timestamp", -1).limit(10)
     
     questions = []
     async for query in recent_queries:
@@ -225,26 +234,28 @@ async def _get_popular_questions(database) -> list:
             "timestamp": query["timestamp"]
         })
     
-    return questions[:10]
+    return questions
 
 async def _get_query_trends(database) -> list:
     """Get query trends over time"""
     # Group queries by day for the last 7 days
-    now = datetime.utcnow()
+    today = datetime.utcnow().replace(hour=0, minute=0, second=0, microsecond=0)
+    days = [today - timedelta(days=i) for i in range(7)]
     
-    trends = []
-    for i in range(7):
-        date = now - timedelta(days=i)
-        start_of_day = date.replace(hour=0, minute=0, second=0, microsecond=0)
-        end_of_day = start_of_day + timedelta(days=1)
-        
-        count = await database.queries.count_documents({
-            "timestamp": {"$gte": start_of_day, "$lt": end_of_day}
-        })
-        
-        trends.append({
-            "date": start_of_day.isoformat(),
-            "query_count": count
-        })
+    pipeline = [
+        {"$match": {"source": "queries", "hour": {"$gte": days[-1]}}},
+        {"$group": {
+            "_id": {"$dateTrunc": {"date": "$hour", "unit": "day"}},
+            "count": {"$sum": "$count"}
+        }}
+    ]
     
-    return trends
+    counts = {}
+    async for day in database[STATS_COLLECTION].aggregate(pipeline):
+        counts[day["_id"]] = day["count"]
+    
+    # Days without queries are absent from the aggregation
+    return [
+        {"date": day.isoformat(), "query_count": counts.get(day, 0)}
+        for day in days
+    ]
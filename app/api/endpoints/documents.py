@@ -1,11 +1,14 @@
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, BackgroundTasks
 from typing import Optional, List
+from datetime import datetime
 import os
 
 from app.models.document import DocumentResponse, DocumentList, DocumentMetadata
-from app.services.document_service import DocumentService
+from app.services.document_service import DocumentService, FileTooLargeError
 from app.services.vector_service import vector_service
+from app.services.qa_service import qa_service
 from app.core.config import settings
+from app.core.cache import invalidate_analytics_cache
 import logging
 
 logger = logging.getLogger(__name__)
@@ -40,9 +43,14 @@ async def upload_document(
     )
     
     try:
-        # Save uploaded file
-        file_content = await file.read()
-        file_path = await document_service.save_uploaded_file(file_content, file.filename)
+        # Stream uploaded file to disk
+        file_path, content_hash = await document_service.save_upload_stream(file, file.filename)
+        
+        # Re-uploading identical content is a no-op
+        existing = await document_service.find_by_content_hash(content_hash)
+        if existing:
+            os.remove(file_path)
+            return existing
         
         # Process document in background
         background_tasks.add_task(
@@ -50,7 +58,8 @@ async def upload_document(
             file_path,
             file.filename,
             file.content_type,
-            metadata
+            metadata,
+            content_hash
         )
         
         return DocumentResponse(
@@ -62,6 +71,8 @@ async def upload_document(
             metadata=metadata
         )
         
+    except FileTooLargeError:
+        raise HTTPException(status_code=413, detail="File too large")
     except Exception as e:
         logger.error(f"Upload failed: {e}")
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
@@ -70,17 +81,27 @@ async def process_document_background(
     file_path: str, 
     filename: str, 
     content_type: str, 
-    metadata: DocumentMetadata
+    metadata: DocumentMetadata,
+    content_hash: str
 ):
     """Background task for document processing"""
     try:
         # Process document
-        document = await document_service.process_document(
-            file_path, filename, content_type, metadata
+        document, created = await document_service.process_document(
+            file_path, filename, content_type, metadata, content_hash
         )
         
+        # Identical content finished processing since the upload was checked;
+        # its chunks are already indexed
+        if not created:
+            os.remove(file_path)
+            logger.info(f"Discarded duplicate upload {filename}; same content as document {document.id}")
+            return
+        
         # Add to vector store
         await vector_service.add_document_chunks(document.id)
+        qa_service.query_cache.clear()
+        await invalidate_analytics_cache()
         
         logger.info(f"Successfully processed document: {filename}")
         
@@ -88,16 +109,18 @@ async def process_document_background(
         logger.error(f"Background processing failed for {filename}: {e}")
 
 @router.get("/", response_model=DocumentList)
-async def list_documents(page: int = 1, limit: int = 20):
-    """List documents with pagination"""
+async def list_documents(
+    before: Optional[datetime] = None,
+    before_id: Optional[str] = None,
+    limit: int = 20
+):
+    """List documents newest first; pass next_before/next_before_id back for the next page"""
     
-    if page < 1:
-        page = 1
     if limit < 1 or limit > 100:
         limit = 20
     
     try:
-        result = await document_service.list_documents(page, limit)
+        result = await document_service.list_documents(before, before_id, limit)
         return DocumentList(**result)
         
     except Exception as e:
@@ -124,5 +147,7 @@ async def delete_document(document_id: str):
     
     # Remove from vector store
     await vector_service.remove_document_chunks(document_id)
+    qa_service.query_cache.clear()
+    await invalidate_analytics_cache()
     
     return {"message": "Document deleted successfully"}
@@ -1,4 +1,5 @@
 from fastapi import APIRouter
+import asyncio
 from datetime import datetime
 from typing import Dict, Any
 
@@ -10,6 +11,37 @@ import logging
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Upper bound for any single dependency check
+CHECK_TIMEOUT = 1.0  # seconds
+
+async def _check_mongo() -> Dict[str, Any]:
+    """Ping MongoDB"""
+    database = get_database()
+    await database.command("ping")
+    return {
+        "status": "healthy",
+        "response_time": "< 10ms"
+    }
+
+async def _check_redis() -> Dict[str, Any]:
+    """Ping Redis"""
+    await redis_client.redis.ping()
+    return {
+        "status": "healthy",
+        "response_time": "< 5ms"
+    }
+
+async def _check_vector_store() -> Dict[str, Any]:
+    """Report whether the vector store is loaded"""
+    if vector_service.vector_store:
+        return {
+            "status": "ready",
+            "index_size": "unknown"
+        }
+    return {
+        "status": "not_ready"
+    }
+
 @router.get("/")
 async def health_check() -> Dict[str, Any]:
     """Comprehensive health check endpoint"""
@@ -21,53 +53,28 @@ async def health_check() -> Dict[str, Any]:
         "services": {}
     }
     
-    # Check MongoDB
-    try:
-        database = await get_database()
-        await database.command("ping")
-        health_status["services"]["mongodb"] = {
-            "status": "healthy",
-            "response_time": "< 10ms"
-        }
-    except Exception as e:
-        health_status["services"]["mongodb"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-        health_status["status"] = "degraded"
+    # Status reported when a check raises or times out
+    checks = {
+        "mongodb": (_check_mongo, "unhealthy"),
+        "redis": (_check_redis, "unhealthy"),
+        "vector_store": (_check_vector_store, "error"),
+    }
     
-    # Check Redis
-    try:
-        await redis_client.redis.ping()
-        health_status["services"]["redis"] = {
-            "status": "healthy",
-            "response_time": "< 5ms"
-        }
-    except Exception as e:
-        health_status["services"]["redis"] = {
-            "status": "unhealthy",
-            "error": str(e)
-        }
-        health_status["status"] = "degraded"
+    # Run all checks concurrently so one slow dependency can't stall the rest
+    results = await asyncio.gather(
+        *[asyncio.wait_for(check(), timeout=CHECK_TIMEOUT) for check, _ in checks.values()],
+        return_exceptions=True
+    )
     
-    # Check Vector Store
-    try:
-        if vector_service.vector_store:
-            health_status["services"]["vector_store"] = {
-                "status": "ready",
-                "index_size": "unknown"
-            }
-        else:
-            health_status["services"]["vector_store"] = {
-                "status": "not_ready"
-            }
+    for (name, (_, error_status)), result in zip(checks.items(), results):
+        if isinstance(result, asyncio.TimeoutError):
+            result = {"status": error_status, "error": f"timed out after {CHECK_TIMEOUT}s"}
+        elif isinstance(result, Exception):
+            result = {"status": error_status, "error": str(result)}
+        
+        health_status["services"][name] = result
+        if result["status"] not in ("healthy", "ready"):
             health_status["status"] = "degraded"
-    except Exception as e:
-        health_status["services"]["vector_store"] = {
-            "status": "error",
-            "error": str(e)
-        }
-        health_status["status"] = "degraded"
     
     return health_status
 
@@ -76,7 +83,7 @@ async def readiness_check():
     """Kubernetes readiness probe"""
     try:
         # Check if all critical services are available
-        database = await get_database()
+        database = get_database()
         await database.command("ping")
         
         if not vector_service.vector_store:
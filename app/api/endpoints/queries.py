@@ -1,7 +1,7 @@
 from fastapi import APIRouter, HTTPException
 from typing import List
 
-from app.models.query import QueryRequest, QueryResponse, QueryHistory
+from app.models.query import QueryRequest, QueryResponse, QueryHistory, QueryHistoryItem
 from app.services.qa_service import qa_service
 from app.core.database import get_database
 import logging
@@ -9,6 +9,17 @@ import logging
 logger = logging.getLogger(__name__)
 router = APIRouter()
 
+# Fields needed for QueryHistoryItem; skips request parameters stored for analytics
+HISTORY_PROJECTION = {
+    "question": 1,
+    "answer": 1,
+    "confidence": 1,
+    "sources_count": 1,
+    "processing_time": 1,
+    "model_used": 1,
+    "timestamp": 1
+}
+
 @router.post("/ask", response_model=QueryResponse)
 async def ask_question(query: QueryRequest):
     """Ask a question and get an AI-powered answer"""
@@ -31,18 +42,18 @@ async def get_query_history(page: int = 1, limit: int = 20):
         limit = 20
     
     try:
-        database = await get_database()
+        database = get_database()
         
         # Count total queries
-        total = await database.queries.count_documents({})
+        total = await database.queries.estimated_document_count()
         
         # Get paginated queries
         skip = (page - 1) * limit
-        cursor = database.queries.find({}).skip(skip).limit(limit).sort("timestamp", -1)
+        cursor = database.queries.find({}, HISTORY_PROJECTION).skip(skip).limit(limit).sort("timestamp", -1)
         
         queries = []
         async for query in cursor:
-            queries.append(QueryResponse(**query))
+            queries.append(QueryHistoryItem(**query))
         
         return QueryHistory(
             queries=queries,
@@ -60,7 +71,7 @@ async def get_query(query_id: str):
     """Get specific query by ID"""
     
     try:
-        database = await get_database()
+        database = get_database()
         query = await database.queries.find_one({"_id": query_id})
         
         if not query:
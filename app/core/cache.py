@@ -0,0 +1,56 @@
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.redis import RedisBackend
+from fastapi_cache.key_builder import default_key_builder
+from starlette.requests import Request
+from starlette.responses import Response
+
+from app.core.redis import redis_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+CACHE_PREFIX = "fastapi-cache"
+ANALYTICS_NAMESPACE = "analytics"
+# Counter folded into every analytics key; bumping it orphans the cached
+# responses, which then age out with their TTL
+ANALYTICS_VERSION_KEY = f"{CACHE_PREFIX}:{ANALYTICS_NAMESPACE}:version"
+
+def init_cache():
+    """Initialize the response cache on top of the shared Redis connection"""
+    FastAPICache.init(RedisBackend(redis_client.redis), prefix=CACHE_PREFIX)
+    logger.info("Response cache initialized")
+
+async def analytics_key_builder(
+    func: Callable[..., Any],
+    namespace: str = "",
+    *,
+    request: Optional[Request] = None,
+    response: Optional[Response] = None,
+    args: Tuple[Any, ...],
+    kwargs: Dict[str, Any],
+) -> str:
+    """Build the default cache key under the current analytics version"""
+    try:
+        version = int(await redis_client.redis.get(ANALYTICS_VERSION_KEY) or 0)
+    except Exception as e:
+        logger.warning(f"Failed to read analytics cache version: {e}")
+        version = 0
+    
+    return default_key_builder(
+        func,
+        f"{namespace}:v{version}",
+        request=request,
+        response=response,
+        args=args,
+        kwargs=kwargs
+    )
+
+async def invalidate_analytics_cache():
+    """Drop cached analytics responses after documents change"""
+    try:
+        # One INCR instead of a keyspace scan for the namespace's keys
+        await redis_client.redis.incr(ANALYTICS_VERSION_KEY)
+    except Exception as e:
+        logger.warning(f"Failed to invalidate analytics cache: {e}")
@@ -1,53 +1,6 @@
 from pydantic_settings import BaseSettings
-from typing import List, Optional
-import os
-
-class Settings(BaseSettings):
-    # API Settings
-    PROJECT_NAME: str = "AI Knowledge Library"
-    PROJECT_VERSION: str = "1.0.0"
-    API_V1_STR: str = "/api/v1"
-    DEBUG: bool = False
-    
-    # Database Settings
-    MONGODB_URL: str = "mongodb://localhost:27017"
-    DATABASE_NAME: str = "ai_library"
-    
-    # OpenAI Settings
-    # OPENAI_API_KEY=
-    OPENAI_API_KEY: str = "any-valid-openai-api-key"
-    OPENAI_MODEL: str = "gpt-3.5-turbo"
-    EMBEDDING_MODEL: str = "text-embedding-ada-002"
-    
-    # Redis Settings
-    REDIS_URL: str = "redis://localhost:6379"
-    
-    # File Upload Settings
-    MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
-    UPLOAD_DIR: str = "data/uploads"
-    ALLOWED_FILE_TYPES: List[str] = ["application/pdf", "text/plain", "text/csv", "application/vnd.openxmlformats-officedocument.wordprocessingml.document"]
-    
-    # Vector Store Settings
-    VECTOR_STORE_PATH: str = "data/vector_stores"
-    CHUNK_SIZE: int = 1000
-    CHUNK_OVERLAP: int = 200
-    
-    # Security Settings
-    SECRET_KEY: str = "your-secret-key-here"
-    ACCESS_TOKEN_EXPIRE_MINUTES: int = 30
-    
-    # CORS Settings
-    ALLOWED_ORIGINS: List[str] = ["*"]
-    
-    class Config:
-        env_file = ".env"
-        case_sensitive = True
-
-settings = Settings()
-
-
-from pydantic_settings import BaseSettings
-from typing import List, Optional
+from functools import lru_cache
+from typing import List, Literal, Optional
 import os
 
 class Settings(BaseSettings):
@@ -60,15 +13,26 @@ class Settings(BaseSettings):
     # Database Settings
     MONGODB_URL: str = "mongodb://localhost:27017"
     DATABASE_NAME: str = "ai_library"
+    MONGODB_MAX_POOL_SIZE: int = 100
+    MONGODB_MIN_POOL_SIZE: int = 10
+    MONGODB_COMPRESSORS: str = "zstd,zlib"
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS: int = 2000
     
     # OpenAI Settings
     OPENAI_API_KEY: str = "your-openai-key"
     OPENAI_MODEL: str = "gpt-3.5-turbo"
     EMBEDDING_MODEL: str = "text-embedding-ada-002"
+    OPENAI_MAX_CONNECTIONS: int = 100
+    OPENAI_MAX_KEEPALIVE_CONNECTIONS: int = 50
+    OPENAI_HTTP_TIMEOUT: float = 30.0  # seconds
     
     # Redis Settings
     REDIS_URL: str = "redis://localhost:6379"
     
+    # Analytics Settings
+    ANALYTICS_CACHE_EXPIRE: int = 120  # seconds
+    STATS_REFRESH_INTERVAL: int = 300  # seconds
+    
     # File Upload Settings
     MAX_FILE_SIZE: int = 10 * 1024 * 1024  # 10MB
     UPLOAD_DIR: str = "data/uploads"
@@ -76,8 +40,25 @@ class Settings(BaseSettings):
     
     # Vector Store Settings
     VECTOR_STORE_PATH: str = "data/vector_stores"
-    CHUNK_SIZE: int = 1000
-    CHUNK_OVERLAP: int = 200
+    EMBEDDING_CACHE_PATH: str = "data/embedding_cache"
+    EMBEDDING_BATCH_SIZE: int = 512
+    VECTOR_INDEX_IVFPQ_MIN_SIZE: int = 10000
+    VECTOR_INDEX_IVFPQ_FACTORY: str = "IVF1024,PQ32x8"
+    VECTOR_INDEX_NPROBE: int = 16
+    VECTOR_QUANTIZATION: Literal["fp32", "fp16", "int8"] = "fp16"
+    VECTOR_INT8_MIN_TRAIN_SIZE: int = 1000  # int8 stores hold fp16 until this many vectors
+    QUERY_EMBEDDING_CACHE_SIZE: int = 10000
+    QUERY_EMBEDDING_CACHE_TTL: int = 3600  # seconds
+    VECTOR_STORE_SAVE_DELAY: float = 5.0  # seconds
+    CHUNK_SIZE_TOKENS: int = 256
+    CHUNK_OVERLAP_TOKENS: int = 50
+    INGEST_WORKERS: int = 4
+    
+    # Semantic Query Cache Settings
+    QUERY_CACHE_TABLES: int = 8
+    QUERY_CACHE_BITS: int = 16
+    QUERY_CACHE_THRESHOLD: float = 0.97
+    QUERY_CACHE_MAX_ENTRIES: int = 1000
     
     # Security Settings
     SECRET_KEY: str = "your-secret-key-here"
@@ -90,4 +71,9 @@ class Settings(BaseSettings):
         env_file = ".env"
         case_sensitive = True
 
-settings = Settings()
+@lru_cache()
+def get_settings() -> Settings:
+    """Build settings from the environment once per process"""
+    return Settings()
+
+settings = get_settings()
@@ -13,7 +13,13 @@ db = Database()
 async def connect_to_mongo():
     """Create database connection"""
     logger.info("Connecting to MongoDB...")
-    db.client = AsyncIOMotorClient(settings.MONGODB_URL)
+    db.client = AsyncIOMotorClient(
+        settings.MONGODB_URL,
+        maxPoolSize=settings.MONGODB_MAX_POOL_SIZE,
+        minPoolSize=settings.MONGODB_MIN_POOL_SIZE,
+        compressors=settings.MONGODB_COMPRESSORS,
+        serverSelectionTimeoutMS=settings.MONGODB_SERVER_SELECTION_TIMEOUT_MS
+    )
     db.database = db.client[settings.DATABASE_NAME]
     logger.info("Connected to MongoDB")
 
@@ -23,26 +29,39 @@ async def close_mongo_connection():
     db.client.close()
     logger.info("Disconnected from MongoDB")
 
-async def get_database() -> AsyncIOMotorDatabase:
+def get_database() -> AsyncIOMotorDatabase:
     """Get database instance"""
     return db.database
 
 async def create_indexes():
     """Create database indexes for better performance"""
-    database = await get_database()
+    database = get_database()
     
     # Documents collection indexes
     await database.documents.create_index([("filename", 1)])
-    await database.documents.create_index([("upload_date", -1)])
+    await database.documents.create_index([("upload_date", -1), ("status", 1)])
+    await database.documents.create_index([("upload_date", -1), ("_id", -1)])
     await database.documents.create_index([("status", 1)])
     await database.documents.create_index([("content_type", 1)])
+    await database.documents.create_index([("metadata.tags", 1)])
+    # One processed document per content; enforces upload dedup across racing requests
+    await database.documents.create_index(
+        [("content_hash", 1)],
+        name="content_hash_unique",
+        unique=True,
+        partialFilterExpression={
+            "content_hash": {"$type": "string"},
+            "status": "processed"
+        }
+    )
     
     # Queries collection indexes
-    await database.queries.create_index([("timestamp", -1)])
-    await database.queries.create_index([("question", "text")])
+    await database.queries.create_index([("timestamp", -1), ("confidence", 1)])
     
     # Knowledge base indexes
-    await database.knowledge_base.create_index([("document_id", 1)])
-    await database.knowledge_base.create_index([("content", "text")])
+    await database.knowledge_base.create_index([("document_id", 1), ("metadata.chunk_index", 1)])
+    
+    # Analytics roll-up indexes
+    await database.hourly_stats.create_index([("source", 1), ("hour", -1)])
     
     logger.info("Database indexes created successfully")
@@ -0,0 +1,31 @@
+import httpx
+
+from app.core.config import settings
+import logging
+
+logger = logging.getLogger(__name__)
+
+_limits = httpx.Limits(
+    max_connections=settings.OPENAI_MAX_CONNECTIONS,
+    max_keepalive_connections=settings.OPENAI_MAX_KEEPALIVE_CONNECTIONS
+)
+
+# Shared keep-alive HTTP/2 pools for every OpenAI client. LangChain calls
+# embeddings synchronously from worker threads and chat asynchronously, so
+# both flavours are needed.
+shared_http = httpx.AsyncClient(
+    http2=True,
+    limits=_limits,
+    timeout=settings.OPENAI_HTTP_TIMEOUT
+)
+shared_sync_http = httpx.Client(
+    http2=True,
+    limits=_limits,
+    timeout=settings.OPENAI_HTTP_TIMEOUT
+)
+
+async def close_http_clients():
+    """Close the shared HTTP connection pools"""
+    await shared_http.aclose()
+    shared_sync_http.close()
+    logger.info("Closed shared HTTP clients")
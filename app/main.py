@@ -1,15 +1,23 @@
-from fastapi import FastAPI
+from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.gzip import GZipMiddleware
 from fastapi.staticfiles import StaticFiles
+from fastapi.responses import ORJSONResponse
 from contextlib import asynccontextmanager
+from pathlib import Path
+from typing import Dict
+import gzip
 import logging
 
 from app.core.config import settings
 from app.core.database import connect_to_mongo, close_mongo_connection, create_indexes
 from app.core.redis import redis_client
+from app.core.cache import init_cache
+from app.core.http import close_http_clients
 from app.services.vector_service import vector_service
+from app.services.stats_service import stats_service
 from app.api.endpoints import documents, queries, analytics, health
+from app.api.endpoints.documents import document_service
 
 # Configure logging
 logging.basicConfig(
@@ -18,6 +26,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+FRONTEND_INDEX = Path("frontend/index.html")
+
+# Frontend page bytes, read and gzipped once at startup
+frontend_cache: Dict[str, bytes] = {}
+
+def load_frontend():
+    """Read the frontend page and precompress it"""
+    try:
+        html = FRONTEND_INDEX.read_bytes()
+    except OSError as e:
+        logger.warning(f"Failed to load frontend: {e}")
+        return
+    frontend_cache["identity"] = html
+    frontend_cache["gzip"] = gzip.compress(html)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     # Startup
@@ -27,18 +50,29 @@ async def lifespan(app: FastAPI):
     await connect_to_mongo()
     await create_indexes()
     await redis_client.connect()
+    init_cache()
     
     # Initialize vector store
     await vector_service.initialize_vector_store()
     
+    # Cache the frontend page
+    load_frontend()
+    
+    # Start analytics roll-ups
+    await stats_service.start()
+    
     logger.info("AI Knowledge Library started successfully")
     
     yield
     
     # Shutdown
     logger.info("Shutting down AI Knowledge Library...")
+    await stats_service.stop()
+    await vector_service.close()
+    await document_service.close()
     await close_mongo_connection()
     await redis_client.disconnect()
+    await close_http_clients()
     logger.info("AI Knowledge Library shut down successfully")
 
 # Create FastAPI app
@@ -46,6 +80,7 @@ app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.PROJECT_VERSION,
     description="Intelligent document search and Q&A system built with FastAPI, MongoDB, and LangChain",
+    default_response_class=ORJSONResponse,
     lifespan=lifespan
 )
 
@@ -66,7 +101,7 @@ app.include_router(queries.router, prefix=f"{settings.API_V1_STR}/queries", tags
 app.include_router(analytics.router, prefix=f"{settings.API_V1_STR}/analytics", tags=["analytics"])
 app.include_router(health.router, prefix="/health", tags=["health"])
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, HTMLResponse
 
 # Mount a static files directory (if you have CSS, JS, etc.)
 
@@ -75,8 +110,17 @@ from fastapi.responses import FileResponse
 
 # Serve frontend
 @app.get("/")
-async def serve_frontend():
-    return FileResponse("frontend/index.html")
+async def serve_frontend(request: Request):
+    if not frontend_cache:
+        return FileResponse(FRONTEND_INDEX)
+    
+    # Precompressed bytes; GZipMiddleware leaves responses with Content-Encoding alone
+    if "gzip" in request.headers.get("accept-encoding", ""):
+        return HTMLResponse(
+            frontend_cache["gzip"],
+            headers={"Content-Encoding": "gzip", "Vary": "Accept-Encoding"}
+        )
+    return HTMLResponse(frontend_cache["identity"])
 
 if __name__ == "__main__":
     import uvicorn
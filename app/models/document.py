@@ -44,7 +44,8 @@ class DocumentUpdate(BaseModel):
 class DocumentList(BaseModel):
     documents: List[DocumentResponse]
     total: int
-    page: int
     limit: int
     has_next: bool
     has_prev: bool
+    next_before: Optional[datetime] = None
+    next_before_id: Optional[str] = None
@@ -25,8 +25,18 @@ class QueryResponse(BaseModel):
     model_used: str
     timestamp: datetime
 
+class QueryHistoryItem(BaseModel):
+    query_id: str = Field(validation_alias="_id")
+    question: str
+    answer: str
+    confidence: float
+    sources_count: int = 0
+    processing_time: float
+    model_used: str
+    timestamp: datetime
+
 class QueryHistory(BaseModel):
-    queries: List[QueryResponse]
+    queries: List[QueryHistoryItem]
     total: int
     page: int
     limit: int
@@ -1,9 +1,16 @@
+import asyncio
+import concurrent.futures
+import functools
+import hashlib
+import multiprocessing
 import uuid
 import os
-import aiofiles
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
-from typing import List, Dict, Any, Optional
+from typing import BinaryIO, List, Dict, Any, Optional, Tuple
 from datetime import datetime
+from fastapi import UploadFile
+from pymongo.errors import DuplicateKeyError
 
 # from langchain.text_splitter import RecursiveCharacterTextSplitter
 # # from langchain_text_splitters import RecursiveCharacterTextSplitter
@@ -13,8 +20,9 @@ from datetime import datetime
 
 # from langchain.document_loaders import PyPDFLoader, TextLoader, CSVLoader
 
-from langchain_text_splitters import RecursiveCharacterTextSplitter
+from langchain_text_splitters import TokenTextSplitter
 from langchain_community.document_loaders import PyPDFLoader, TextLoader, CSVLoader
+from langchain_core.documents import Document
 
 from app.core.config import settings
 from app.core.database import get_database
@@ -23,57 +31,173 @@ import logging
 
 logger = logging.getLogger(__name__)
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+CHUNK_INSERT_BATCH_SIZE = 500
+
+# Fields needed for DocumentResponse; skips file_path, content_hash and errors
+LIST_PROJECTION = {
+    "filename": 1,
+    "content_type": 1,
+    "upload_date": 1,
+    "status": 1,
+    "processing_time": 1,
+    "chunk_count": 1,
+    "file_size": 1,
+    "metadata": 1
+}
+
+class FileTooLargeError(Exception):
+    """Raised when an upload exceeds MAX_FILE_SIZE"""
+
+def _copy_upload(source: BinaryIO, file_path: Path, max_size: int) -> str:
+    """Blocking chunked copy that aborts once max_size is exceeded; returns the SHA-256 of the content"""
+    hasher = hashlib.sha256()
+    written = 0
+    with open(file_path, "wb") as f:
+        while chunk := source.read(UPLOAD_CHUNK_SIZE):
+            written += len(chunk)
+            if written > max_size:
+                raise FileTooLargeError(f"{file_path.name} exceeds {max_size} bytes")
+            hasher.update(chunk)
+            f.write(chunk)
+    return hasher.hexdigest()
+
+LOADERS = {
+    "application/pdf": PyPDFLoader,
+    "text/plain": TextLoader,
+    "text/csv": CSVLoader,
+}
+
+@functools.lru_cache()
+def _get_text_splitter(chunk_size: int, chunk_overlap: int) -> TokenTextSplitter:
+    """Token-based splitter, built once per process since tiktoken may fetch its encoding"""
+    # tiktoken does the BPE natively, and token-sized chunks never overflow
+    # the embedding model's context window
+    return TokenTextSplitter.from_tiktoken_encoder(
+        encoding_name="cl100k_base",
+        chunk_size=chunk_size,
+        chunk_overlap=chunk_overlap
+    )
+
+def _load_and_split(file_path: str, content_type: str, chunk_size: int, chunk_overlap: int) -> List[Document]:
+    """Parse a file and split it into chunks; runs in an ingestion worker process"""
+    documents = LOADERS[content_type](file_path).load()
+    return _get_text_splitter(chunk_size, chunk_overlap).split_documents(documents)
+
 class DocumentService:
     def __init__(self):
-        self.text_splitter = RecursiveCharacterTextSplitter(
-            chunk_size=settings.CHUNK_SIZE,
-            chunk_overlap=settings.CHUNK_OVERLAP,
-            length_function=len
+        self.loaders = LOADERS
+        self._pool: Optional[concurrent.futures.ProcessPoolExecutor] = None
+    
+    @property
+    def pool(self) -> concurrent.futures.ProcessPoolExecutor:
+        """Worker processes for CPU-bound parsing, started on first use"""
+        if self._pool is None:
+            # Spawn rather than fork: the server process already runs threads (Motor, to_thread)
+            self._pool = concurrent.futures.ProcessPoolExecutor(
+                max_workers=settings.INGEST_WORKERS,
+                mp_context=multiprocessing.get_context("spawn")
+            )
+        return self._pool
+    
+    async def close(self):
+        """Shut down the worker processes, if started"""
+        pool, self._pool = self._pool, None
+        if pool is not None:
+            await asyncio.to_thread(pool.shutdown, cancel_futures=True)
+    
+    async def _load_and_split_in_pool(self, file_path: str, content_type: str) -> List[Document]:
+        """Parse and chunk a file in a worker process, replacing the pool once if it has broken"""
+        loop = asyncio.get_running_loop()
+        args = (
+            _load_and_split,
+            file_path,
+            content_type,
+            settings.CHUNK_SIZE_TOKENS,
+            settings.CHUNK_OVERLAP_TOKENS
         )
         
-        self.loaders = {
-            "application/pdf": PyPDFLoader,
-            "text/plain": TextLoader,
-            "text/csv": CSVLoader,
-        }
+        pool = self.pool
+        try:
+            return await loop.run_in_executor(pool, *args)
+        except BrokenProcessPool:
+            # A worker died (OOM, a parser crash) and took the pool with it; only the
+            # first caller to notice discards it, so concurrent uploads share the new one
+            logger.warning("Document worker pool broke; starting a new one")
+            if self._pool is pool:
+                self._pool = None
+                pool.shutdown(wait=False)
+            return await loop.run_in_executor(self.pool, *args)
     
-    async def save_uploaded_file(self, file_content: bytes, filename: str) -> str:
-        """Save uploaded file to disk"""
+    def _new_upload_path(self, filename: str) -> Path:
+        """Build a unique destination path in the upload directory"""
         upload_dir = Path(settings.UPLOAD_DIR)
         upload_dir.mkdir(parents=True, exist_ok=True)
         
         file_id = str(uuid.uuid4())
-        file_path = upload_dir / f"{file_id}_{filename}"
+        return upload_dir / f"{file_id}_{filename}"
+    
+    async def save_upload_stream(self, upload: UploadFile, filename: str) -> Tuple[str, str]:
+        """Copy an upload to disk in a worker thread, enforcing MAX_FILE_SIZE.
         
-        async with aiofiles.open(file_path, "wb") as f:
-            await f.write(file_content)
+        Returns the saved path and the SHA-256 of the content, computed during the copy.
+        """
+        file_path = self._new_upload_path(filename)
         
-        return str(file_path)
+        try:
+            content_hash = await asyncio.to_thread(
+                _copy_upload, upload.file, file_path, settings.MAX_FILE_SIZE
+            )
+        except Exception:
+            # Don't leave partial uploads behind
+            file_path.unlink(missing_ok=True)
+            raise
+        
+        return str(file_path), content_hash
+    
+    async def find_by_content_hash(self, content_hash: str) -> Optional[DocumentResponse]:
+        """Get an already processed document with identical content"""
+        database = get_database()
+        document = await database.documents.find_one({
+            "content_hash": content_hash,
+            "status": DocumentStatus.PROCESSED.value
+        })
+        
+        if document:
+            return DocumentResponse(**document)
+        return None
     
     async def process_document(
         self, 
         file_path: str, 
         filename: str, 
         content_type: str,
-        metadata: Optional[DocumentMetadata] = None
-    ) -> DocumentResponse:
-        """Process uploaded document and extract chunks"""
+        metadata: Optional[DocumentMetadata] = None,
+        content_hash: Optional[str] = None
+    ) -> Tuple[DocumentResponse, bool]:
+        """Process uploaded document and extract chunks.
+        
+        Returns the document and whether it was created; False means content_hash
+        matched an already processed document, which is returned instead.
+        """
         
         start_time = datetime.utcnow()
         doc_id = str(uuid.uuid4())
         
+        # Identical content has already been parsed and embedded
+        if content_hash:
+            existing = await self.find_by_content_hash(content_hash)
+            if existing:
+                logger.info(f"Skipping {filename}: same content as document {existing.id}")
+                return existing, False
+        
         try:
             # Validate file type
             if content_type not in self.loaders:
                 raise ValueError(f"Unsupported file type: {content_type}")
             
-            # Load document
-            loader_class = self.loaders[content_type]
-            loader = loader_class(file_path)
-            documents = loader.load()
-            
-            # Split into chunks
-            chunks = self.text_splitter.split_documents(documents)
+            # Load and split into chunks in a worker process, off the event loop
+            chunks = await self._load_and_split_in_pool(file_path, content_type)
             
             # Get file size
             file_size = os.path.getsize(file_path)
@@ -91,10 +215,21 @@ class DocumentService:
                 "file_size": file_size,
                 "metadata": metadata.dict() if metadata else {}
             }
+            # Left out rather than null when unknown, so the unique index ignores it
+            if content_hash:
+                document_record["content_hash"] = content_hash
             
             # Save to database
-            database = await get_database()
-            await database.documents.insert_one(document_record)
+            database = get_database()
+            try:
+                await database.documents.insert_one(document_record)
+            except DuplicateKeyError:
+                # A concurrent upload of the same content was stored first
+                existing = await self.find_by_content_hash(content_hash) if content_hash else None
+                if existing is None:
+                    raise
+                logger.info(f"Skipping {filename}: same content as document {existing.id}")
+                return existing, False
             
             # Save chunks to knowledge base
             chunk_records = []
@@ -113,15 +248,23 @@ class DocumentService:
                 chunk_records.append(chunk_record)
             
             if chunk_records:
-                await database.knowledge_base.insert_many(chunk_records)
+                # Chunk ids are unique, so unordered batches can be written concurrently
+                batches = [
+                    chunk_records[i:i + CHUNK_INSERT_BATCH_SIZE]
+                    for i in range(0, len(chunk_records), CHUNK_INSERT_BATCH_SIZE)
+                ]
+                await asyncio.gather(*[
+                    database.knowledge_base.insert_many(batch, ordered=False)
+                    for batch in batches
+                ])
             
             logger.info(f"Successfully processed document: {filename}")
             
-            return DocumentResponse(**document_record)
+            return DocumentResponse(**document_record), True
             
         except Exception as e:
             # Update status to failed
-            database = await get_database()
+            database = get_database()
             await database.documents.update_one(
                 {"_id": doc_id},
                 {"$set": {
@@ -135,44 +278,61 @@ class DocumentService:
     
     async def get_document(self, document_id: str) -> Optional[DocumentResponse]:
         """Get document by ID"""
-        database = await get_database()
+        database = get_database()
         document = await database.documents.find_one({"_id": document_id})
         
         if document:
             return DocumentResponse(**document)
         return None
     
-    async def list_documents(self, page: int = 1, limit: int = 20) -> Dict[str, Any]:
-        """List documents with pagination"""
-        database = await get_database()
+    async def list_documents(
+        self,
+        before: Optional[datetime] = None,
+        before_id: Optional[str] = None,
+        limit: int = 20
+    ) -> Dict[str, Any]:
+        """List documents newest first, paging by the (upload_date, _id) of the last one seen"""
+        database = get_database()
         
-        # Count total documents
-        total = await database.documents.count_documents({})
+        query = {}
+        if before:
+            if before_id:
+                query = {"$or": [
+                    {"upload_date": {"$lt": before}},
+                    {"upload_date": before, "_id": {"$lt": before_id}}
+                ]}
+            else:
+                query = {"upload_date": {"$lt": before}}
         
-        # Calculate pagination
-        skip = (page - 1) * limit
-        has_next = skip + limit < total
-        has_prev = page > 1
+        # Fetch one extra document to learn whether another page exists
+        cursor = database.documents.find(query, projection=LIST_PROJECTION).sort(
+            [("upload_date", -1), ("_id", -1)]
+        ).limit(limit + 1)
         
-        # Get documents
-        cursor = database.documents.find({}).skip(skip).limit(limit).sort("upload_date", -1)
-        documents = []
+        # Count and page are independent; overlap the two round-trips. The count
+        # is O(1) from collection metadata, good enough for a UI footer
+        total, docs = await asyncio.gather(
+            database.documents.estimated_document_count(),
+            cursor.to_list(length=limit + 1)
+        )
         
-        async for doc in cursor:
-            documents.append(DocumentResponse(**doc))
+        has_next = len(docs) > limit
+        documents = [DocumentResponse(**doc) for doc in docs[:limit]]
+        last = documents[-1] if has_next else None
         
         return {
             "documents": documents,
             "total": total,
-            "page": page,
             "limit": limit,
             "has_next": has_next,
-            "has_prev": has_prev
+            "has_prev": before is not None,
+            "next_before": last.upload_date if last else None,
+            "next_before_id": last.id if last else None
         }
     
     async def delete_document(self, document_id: str) -> bool:
         """Delete document and its chunks"""
-        database = await get_database()
+        database = get_database()
         
         # Delete document
         result = await database.documents.delete_one({"_id": document_id})
@@ -1,5 +1,7 @@
 import uuid
-from typing import Dict, Any, Optional
+import asyncio
+import numpy as np
+from typing import Dict, Any, Optional, Set
 from datetime import datetime
 
 # from langchain_openai import ChatOpenAI
@@ -7,28 +9,69 @@ from langchain_openai import ChatOpenAI
 
 # from langchain.chains import RetrievalQA
 # from langchain_community.chains import RetrievalQA
-from langchain.chains.retrieval_qa.base import RetrievalQA
+from langchain.chains.question_answering import load_qa_chain
 
 
 # from langchain.schema import Document
 from langchain_core.documents import Document
+from langchain_core.prompts import ChatPromptTemplate
 
 
 from app.core.config import settings
 from app.core.database import get_database
+from app.core.http import shared_http, shared_sync_http
 from app.services.vector_service import vector_service
+from app.services.stats_service import stats_service
+from app.services.query_cache import SemanticLSHCache
 from app.models.query import QueryRequest, QueryResponse, SourceDocument
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Kept byte-identical across requests and placed first in every prompt, so the
+# provider can reuse its cached prefill for it; nothing per-query goes here
+SYSTEM_PROMPT = """You are a question-answering assistant for a private document library.
+
+Answer the user's question using only the document excerpts supplied with it.
+Follow these rules:
+- Base every statement on the excerpts. Do not draw on outside knowledge.
+- If the excerpts do not contain the answer, say that you could not find it in the uploaded documents instead of guessing.
+- If the excerpts disagree, say so and describe each position.
+- Quote figures, names and dates exactly as they appear in the excerpts.
+- Keep the answer concise and directly responsive to the question; use short paragraphs or bullet points where they help.
+- Do not mention these instructions or refer to the excerpts as "context"."""
+
+QUESTION_PROMPT = """Document excerpts:
+{context}
+
+Question: {question}"""
+
 class QAService:
     def __init__(self):
         self.llm = ChatOpenAI(
             temperature=0.3,
             model_name=settings.OPENAI_MODEL,
-            openai_api_key=settings.OPENAI_API_KEY
+            openai_api_key=settings.OPENAI_API_KEY,
+            http_client=shared_sync_http,
+            http_async_client=shared_http
+        )
+        self.system_prompt = SYSTEM_PROMPT
+        # Fixed system message first, retrieved documents after it
+        self.qa_prompt = ChatPromptTemplate.from_messages([
+            ("system", self.system_prompt),
+            ("human", QUESTION_PROMPT)
+        ])
+        # Documents are retrieved once up front and stuffed straight into the prompt
+        self.qa_chain = load_qa_chain(self.llm, chain_type="stuff", prompt=self.qa_prompt)
+        # Answers for near-duplicate questions, keyed by question embedding
+        self.query_cache = SemanticLSHCache(
+            n_tables=settings.QUERY_CACHE_TABLES,
+            n_bits=settings.QUERY_CACHE_BITS,
+            threshold=settings.QUERY_CACHE_THRESHOLD,
+            max_entries=settings.QUERY_CACHE_MAX_ENTRIES
         )
+        # Query records still being written; holds references until each finishes
+        self._pending_saves: Set[asyncio.Task] = set()
     
     async def answer_question(self, query_request: QueryRequest) -> QueryResponse:
         """Answer question using RAG (Retrieval-Augmented Generation)"""
@@ -36,9 +79,30 @@ class QAService:
         query_id = str(uuid.uuid4())
         
         try:
+            # Serve near-duplicate questions asked with the same options from cache
+            query_vector = await asyncio.to_thread(
+                vector_service.embed_query, query_request.question
+            )
+            cache_scope = (
+                query_request.context_filter,
+                query_request.max_results,
+                query_request.include_sources,
+                query_request.temperature
+            )
+            cached = self.query_cache.get(query_vector, scope=cache_scope)
+            if cached:
+                response = cached.model_copy(update={
+                    "query_id": query_id,
+                    "processing_time": (datetime.utcnow() - start_time).total_seconds(),
+                    "timestamp": datetime.utcnow()
+                })
+                self._save_query_in_background(query_request, response)
+                return response
+            
             # Search for relevant documents
-            docs_with_scores = vector_service.search_similar_with_scores(
-                query_request.question, 
+            docs_with_scores = await asyncio.to_thread(
+                vector_service.search_similar_by_vector_with_scores,
+                query_vector, 
                 k=query_request.max_results
             )
             
@@ -54,46 +118,43 @@ class QAService:
                     timestamp=datetime.utcnow()
                 )
             
-            # Create retriever from vector store
-            retriever = vector_service.vector_store.as_retriever(
-                search_type="similarity",
-                search_kwargs={"k": query_request.max_results}
-            )
+            # Get answer from the documents already retrieved
+            result = await self.qa_chain.ainvoke({
+                "input_documents": [doc for doc, _ in docs_with_scores],
+                "question": query_request.question
+            })
             
-            # Create QA chain
-            qa_chain = RetrievalQA.from_chain_type(
-                llm=self.llm,
-                chain_type="stuff",
-                retriever=retriever,
-                return_source_documents=True
+            # Convert distances to similarities in one pass
+            relevance = 1.0 - np.fromiter(
+                (score for _, score in docs_with_scores),
+                dtype=np.float32,
+                count=len(docs_with_scores)
             )
             
-            # Get answer
-            result = qa_chain({"query": query_request.question})
-            
             # Process sources
             sources = []
             if query_request.include_sources:
-                for i, (doc, score) in enumerate(docs_with_scores):
-                    source = SourceDocument(
-                        content=doc.page_content[:300] + "..." if len(doc.page_content) > 300 else doc.page_content,
+                sources = [
+                    SourceDocument(
+                        content=content[:300] + "..." if len(content := doc.page_content) > 300 else content,
                         metadata=doc.metadata,
-                        relevance_score=float(1.0 - score),  # Convert distance to similarity
+                        relevance_score=float(score),
                         document_id=doc.metadata.get("document_id", "unknown"),
                         chunk_index=doc.metadata.get("chunk_index", i)
                     )
-                    sources.append(source)
+                    for i, ((doc, _), score) in enumerate(zip(docs_with_scores, relevance))
+                ]
             
             # Calculate confidence based on relevance scores and answer length
-            avg_relevance = sum(s.relevance_score for s in sources) / len(sources) if sources else 0.0
-            answer_length_factor = min(1.0, len(result["result"]) / 200)
+            avg_relevance = float(relevance.mean())
+            answer_length_factor = min(1.0, len(result["output_text"]) / 200)
             confidence = (avg_relevance + answer_length_factor) / 2
             
             processing_time = (datetime.utcnow() - start_time).total_seconds()
             
             # Create response
             response = QueryResponse(
-                answer=result["result"],
+                answer=result["output_text"],
                 confidence=min(0.95, confidence),
                 sources=sources,
                 query_id=query_id,
@@ -102,8 +163,10 @@ class QAService:
                 timestamp=datetime.utcnow()
             )
             
-            # Save query to database
-            await self._save_query_to_database(query_request, response)
+            self.query_cache.set(query_vector, response, scope=cache_scope)
+            
+            # Save query to database without holding up the response
+            self._save_query_in_background(query_request, response)
             
             return response
             
@@ -121,10 +184,16 @@ class QAService:
                 timestamp=datetime.utcnow()
             )
     
+    def _save_query_in_background(self, query_request: QueryRequest, response: QueryResponse):
+        """Schedule the query record write and return immediately"""
+        task = asyncio.create_task(self._save_query_to_database(query_request, response))
+        self._pending_saves.add(task)
+        task.add_done_callback(self._pending_saves.discard)
+    
     async def _save_query_to_database(self, query_request: QueryRequest, response: QueryResponse):
         """Save query and response to database for analytics"""
         try:
-            database = await get_database()
+            database = get_database()
             
             query_record = {
                 "_id": response.query_id,
@@ -141,6 +210,8 @@ class QAService:
             }
             
             await database.queries.insert_one(query_record)
+            # Query stats are left to expire with the analytics cache TTL
+            await stats_service.record_query(response.confidence, response.processing_time)
             
         except Exception as e:
             logger.warning(f"Failed to save query to database: {e}")
@@ -0,0 +1,109 @@
+from collections import OrderedDict
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+import numpy as np
+
+import logging
+
+logger = logging.getLogger(__name__)
+
+class SemanticLSHCache:
+    """Cache values by embedding, returning hits for near-duplicate vectors.
+
+    Vectors are hashed with random-projection LSH into ``n_tables`` tables of
+    ``n_bits``-bit buckets; candidates sharing a bucket are confirmed by cosine
+    similarity against ``threshold``.
+    """
+
+    def __init__(
+        self,
+        n_tables: int = 8,
+        n_bits: int = 16,
+        threshold: float = 0.97,
+        max_entries: int = 1000,
+        seed: int = 0
+    ):
+        self.n_tables = n_tables
+        self.n_bits = n_bits
+        self.threshold = threshold
+        self.max_entries = max_entries
+        self._rng = np.random.default_rng(seed)
+        self._powers = 1 << np.arange(n_bits, dtype=np.uint64)
+        self._planes: Optional[np.ndarray] = None
+        self._tables: List[Dict[int, set]] = []
+        self._entries: "OrderedDict[int, Tuple[np.ndarray, Hashable, Any, Tuple[int, ...]]]" = OrderedDict()
+        self._next_id = 0
+
+    def _normalize(self, vector) -> np.ndarray:
+        vec = np.asarray(vector, dtype=np.float32)
+        norm = np.linalg.norm(vec)
+        return vec / norm if norm else vec
+
+    def _buckets(self, vec: np.ndarray) -> Tuple[int, ...]:
+        # Projection planes are drawn on first use so any embedding size works
+        if self._planes is None or self._planes.shape[1] != vec.shape[0]:
+            self.clear()
+            self._planes = self._rng.standard_normal(
+                (self.n_tables * self.n_bits, vec.shape[0])
+            ).astype(np.float32)
+
+        bits = (self._planes @ vec > 0).reshape(self.n_tables, self.n_bits)
+        return tuple(int(key) for key in bits.astype(np.uint64) @ self._powers)
+
+    def get(self, vector, scope: Hashable = None) -> Optional[Any]:
+        """Return the cached value closest to ``vector`` within ``scope``, if similar enough"""
+        vec = self._normalize(vector)
+        buckets = self._buckets(vec)
+
+        candidates = set()
+        for table, key in zip(self._tables, buckets):
+            candidates |= table.get(key, set())
+
+        best_id, best_score = None, self.threshold
+        for entry_id in candidates:
+            entry_vec, entry_scope, _, _ = self._entries[entry_id]
+            if entry_scope != scope:
+                continue
+            score = float(entry_vec @ vec)
+            if score >= best_score:
+                best_id, best_score = entry_id, score
+
+        if best_id is None:
+            return None
+
+        self._entries.move_to_end(best_id)
+        return self._entries[best_id][2]
+
+    def set(self, vector, value: Any, scope: Hashable = None):
+        """Store ``value`` under ``vector`` within ``scope``"""
+        vec = self._normalize(vector)
+        buckets = self._buckets(vec)
+        if not self._tables:
+            self._tables = [{} for _ in range(self.n_tables)]
+
+        entry_id = self._next_id
+        self._next_id += 1
+        self._entries[entry_id] = (vec, scope, value, buckets)
+        for table, key in zip(self._tables, buckets):
+            table.setdefault(key, set()).add(entry_id)
+
+        while len(self._entries) > self.max_entries:
+            self._evict()
+
+    def _evict(self):
+        """Drop the least recently used entry"""
+        entry_id, (_, _, _, buckets) = self._entries.popitem(last=False)
+        for table, key in zip(self._tables, buckets):
+            bucket = table.get(key)
+            if bucket is not None:
+                bucket.discard(entry_id)
+                if not bucket:
+                    del table[key]
+
+    def clear(self):
+        """Drop every cached entry"""
+        self._entries.clear()
+        self._tables = [{} for _ in range(self.n_tables)]
+
+    def __len__(self) -> int:
+        return len(self._entries)
@@ -0,0 +1,156 @@
+import asyncio
+from typing import Dict, Optional
+from datetime import datetime, timedelta
+
+from app.core.config import settings
+from app.core.database import get_database
+from app.core.redis import redis_client
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Rolled-up collection name and the timestamp field of each source collection
+STATS_COLLECTION = "hourly_stats"
+STATS_SOURCES = {
+    "documents": "upload_date",
+    "queries": "timestamp",
+}
+
+# Redis hash of running query totals, and the confidence counted as a success
+QUERY_COUNTERS_KEY = "stats:queries"
+SUCCESS_CONFIDENCE = 0.5
+COUNTER_RECONCILE_INTERVAL = timedelta(days=1)
+
+class StatsService:
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+        self._last_reconciled: Optional[datetime] = None
+
+    async def refresh_stats(self, since: Optional[datetime] = None):
+        """Roll source collections up into hourly buckets"""
+        database = get_database()
+
+        # Buckets are rebuilt from the hour containing since, so start on the hour
+        if since:
+            since = since.replace(minute=0, second=0, microsecond=0)
+
+        # Marks the buckets this run wrote; BSON dates keep milliseconds only
+        refreshed_at = datetime.utcnow()
+        refreshed_at = refreshed_at.replace(microsecond=refreshed_at.microsecond // 1000 * 1000)
+
+        for source, time_field in STATS_SOURCES.items():
+            match = {time_field: {"$type": "date"}}
+            stale = {"source": source, "refreshed_at": {"$ne": refreshed_at}}
+            if since:
+                match[time_field]["$gte"] = since
+                stale["hour"] = {"$gte": since}
+
+            pipeline = [
+                {"$match": match},
+                {"$group": {
+                    "_id": {
+                        "source": source,
+                        "hour": {"$dateTrunc": {"date": f"${time_field}", "unit": "hour"}}
+                    },
+                    "count": {"$sum": 1},
+                    "total_processing_time": {"$sum": "$processing_time"},
+                    # Averages only count rows that recorded a processing time
+                    "timed_count": {"$sum": {"$cond": [{"$isNumber": "$processing_time"}, 1, 0]}}
+                }},
+                {"$addFields": {
+                    "source": "$_id.source",
+                    "hour": "$_id.hour",
+                    "refreshed_at": refreshed_at
+                }},
+                {"$merge": {"into": STATS_COLLECTION, "whenMatched": "replace"}}
+            ]
+            await database[source].aggregate(pipeline).to_list(None)
+            # $merge only touches hours that still have rows; buckets in the window
+            # it didn't rewrite belong to hours emptied by deletes. Dropping them
+            # after the merge means readers never see a bucket missing mid-refresh
+            await database[STATS_COLLECTION].delete_many(stale)
+
+    async def record_query(self, confidence: float, processing_time: float):
+        """Bump the running query counters for one answered question"""
+        pipe = redis_client.redis.pipeline(transaction=False)
+        pipe.hincrby(QUERY_COUNTERS_KEY, "total", 1)
+        if confidence > SUCCESS_CONFIDENCE:
+            pipe.hincrby(QUERY_COUNTERS_KEY, "high_conf", 1)
+        pipe.hincrbyfloat(QUERY_COUNTERS_KEY, "sum_time", processing_time)
+        await pipe.execute()
+
+    async def count_queries(self) -> Dict[str, float]:
+        """Total the query counters straight from MongoDB"""
+        database = get_database()
+        pipeline = [
+            {"$group": {
+                "_id": None,
+                "total": {"$sum": 1},
+                "high_conf": {"$sum": {"$cond": [{"$gt": ["$confidence", SUCCESS_CONFIDENCE]}, 1, 0]}},
+                "sum_time": {"$sum": "$processing_time"}
+            }}
+        ]
+        result = await database.queries.aggregate(pipeline).to_list(1)
+
+        counters = {"total": 0, "high_conf": 0, "sum_time": 0.0}
+        if result:
+            counters = {name: result[0][name] for name in counters}
+        return counters
+
+    async def reconcile_query_counters(self) -> Dict[str, float]:
+        """Rebuild the running query counters from MongoDB"""
+        counters = await self.count_queries()
+        await redis_client.redis.hset(QUERY_COUNTERS_KEY, mapping=counters)
+        self._last_reconciled = datetime.utcnow()
+        return counters
+
+    async def get_query_counters(self) -> Dict[str, float]:
+        """Read the running query counters, rebuilding them if missing"""
+        raw = await redis_client.redis.hgetall(QUERY_COUNTERS_KEY)
+        if not raw:
+            return await self.reconcile_query_counters()
+
+        counters = {key.decode(): float(value) for key, value in raw.items()}
+        return {
+            "total": int(counters.get("total", 0)),
+            "high_conf": int(counters.get("high_conf", 0)),
+            "sum_time": counters.get("sum_time", 0.0)
+        }
+
+    async def start(self):
+        """Build the roll-up once and keep recent buckets fresh in the background"""
+        try:
+            await self.refresh_stats()
+            await self.reconcile_query_counters()
+        except Exception as e:
+            logger.warning(f"Initial stats roll-up failed: {e}")
+
+        self._task = asyncio.create_task(self._refresh_periodically())
+        logger.info("Stats roll-up started")
+
+    async def stop(self):
+        """Stop the background refresh task"""
+        if self._task:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _refresh_periodically(self):
+        """Recompute the buckets still visible to trends and 24h usage"""
+        while True:
+            await asyncio.sleep(settings.STATS_REFRESH_INTERVAL)
+            try:
+                since = datetime.utcnow().replace(minute=0, second=0, microsecond=0) - timedelta(days=8)
+                await self.refresh_stats(since)
+
+                # Counters drift if an increment is lost; resync them daily
+                if not self._last_reconciled or datetime.utcnow() - self._last_reconciled >= COUNTER_RECONCILE_INTERVAL:
+                    await self.reconcile_query_counters()
+            except Exception as e:
+                logger.warning(f"Stats roll-up refresh failed: {e}")
+
+# Global stats service instance
+stats_service = StatsService()
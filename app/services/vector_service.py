@@ -1,5 +1,12 @@
 import os
-from typing import List, Dict, Any, Optional
+import asyncio
+import hashlib
+import pickle
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import List, Dict, Any, Optional, Set
 from pathlib import Path
 
 # # from langchain_openai import OpenAIEmbeddings
@@ -12,9 +19,15 @@ from pathlib import Path
 # from langchain.schema import Document
 # # from langchain_core.documents import Document
 
+import faiss
+import numpy as np
+
 from langchain_openai import OpenAIEmbeddings
 from langchain_community.vectorstores import FAISS
+from langchain_community.docstore.in_memory import InMemoryDocstore
 from langchain_core.documents import Document
+from langchain.embeddings import CacheBackedEmbeddings
+from langchain.storage import LocalFileStore
 
 # from langchain_community.embeddings import HuggingFaceEmbeddings
 
@@ -23,31 +36,190 @@ from langchain_core.documents import Document
 
 from app.core.config import settings
 from app.core.database import get_database
+from app.core.http import shared_http, shared_sync_http
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Scalar quantizers for the flat index, by VECTOR_QUANTIZATION; "fp32" stores raw vectors
+SCALAR_QUANTIZERS = {
+    "fp16": faiss.ScalarQuantizer.QT_fp16,
+    "int8": faiss.ScalarQuantizer.QT_8bit,
+}
+
+# Knowledge base fields needed to embed and index a chunk
+CHUNK_PROJECTION = {"content": 1, "metadata": 1, "document_id": 1}
+
+def _faiss_id(chunk_id: str) -> int:
+    """Stable non-negative int64 id for a knowledge base chunk"""
+    digest = hashlib.sha256(chunk_id.encode()).digest()
+    return int.from_bytes(digest[:8], "big") & (2 ** 63 - 1)
+
+def _read_index(path: Path, io_flags: int = 0) -> faiss.Index:
+    """Read a saved index, restoring nprobe, which faiss doesn't persist"""
+    index = faiss.read_index(str(path), io_flags)
+    ivf = faiss.try_extract_index_ivf(index)
+    if ivf is not None:
+        ivf.nprobe = settings.VECTOR_INDEX_NPROBE
+    return index
+
+def _is_id_mapped(index: faiss.Index) -> bool:
+    """Whether an index keys vectors by chunk id, as _build_index and _flat_index make them"""
+    return isinstance(index, faiss.IndexIDMap2) or faiss.try_extract_index_ivf(index) is not None
+
+def _is_int8(index: faiss.Index) -> bool:
+    """Whether an ID-mapped flat index stores int8 scalar-quantized vectors"""
+    inner = faiss.downcast_index(index.index)
+    return (
+        isinstance(inner, faiss.IndexScalarQuantizer)
+        and inner.sq.qtype == faiss.ScalarQuantizer.QT_8bit
+    )
+
+def _ids_by_document(store: FAISS) -> Dict[str, Set[int]]:
+    """Group a store's faiss ids by the document their chunks came from"""
+    grouped: Dict[str, Set[int]] = {}
+    for faiss_id, chunk_id in store.index_to_docstore_id.items():
+        document_id = store.docstore.search(chunk_id).metadata.get("document_id")
+        grouped.setdefault(document_id, set()).add(faiss_id)
+    return grouped
+
+def _add_to_store(store: FAISS, document_ids: Dict[str, Set[int]], vectors: np.ndarray,
+                  ids: np.ndarray, documents: Dict[int, tuple]) -> int:
+    """Add embedded chunks to a store, skipping ones already present"""
+    # Re-adding a document must not index its vectors twice
+    keep = np.fromiter(
+        (faiss_id not in store.index_to_docstore_id for faiss_id in ids.tolist()),
+        dtype=bool,
+        count=len(ids)
+    )
+    if not keep.any():
+        return 0
+    vectors, ids = vectors[keep], ids[keep]
+    added = {faiss_id: documents[faiss_id] for faiss_id in ids.tolist()}
+    
+    # The docstore rejects existing ids, so fill it before the index
+    store.docstore.add({chunk_id: document for chunk_id, document in added.values()})
+    try:
+        store.index.add_with_ids(vectors, ids)
+    except Exception:
+        store.docstore.delete([chunk_id for chunk_id, _ in added.values()])
+        raise
+    
+    store.index_to_docstore_id.update({
+        faiss_id: chunk_id for faiss_id, (chunk_id, _) in added.items()
+    })
+    for faiss_id, (_, document) in added.items():
+        document_ids.setdefault(document.metadata["document_id"], set()).add(faiss_id)
+    return len(added)
+
+def _remove_from_store(store: FAISS, document_ids: Dict[str, Set[int]], document_id: str) -> int:
+    """Remove a document's chunks from a store"""
+    faiss_ids = document_ids.pop(document_id, None)
+    if not faiss_ids:
+        return 0
+    
+    store.index.remove_ids(np.fromiter(faiss_ids, dtype=np.int64, count=len(faiss_ids)))
+    store.docstore.delete([store.index_to_docstore_id.pop(faiss_id) for faiss_id in faiss_ids])
+    return len(faiss_ids)
+
+class _ReadWriteLock:
+    """Many concurrent readers or one writer; waiting writers block new readers"""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._readers = 0
+        self._writing = False
+        self._writers_waiting = 0
+
+    @contextmanager
+    def read(self):
+        with self._cond:
+            while self._writing or self._writers_waiting:
+                self._cond.wait()
+            self._readers += 1
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._readers -= 1
+                if not self._readers:
+                    self._cond.notify_all()
+
+    @contextmanager
+    def write(self):
+        with self._cond:
+            self._writers_waiting += 1
+            while self._writing or self._readers:
+                self._cond.wait()
+            self._writers_waiting -= 1
+            self._writing = True
+        try:
+            yield
+        finally:
+            with self._cond:
+                self._writing = False
+                self._cond.notify_all()
+
 class VectorService:
     def __init__(self):
-        self.embeddings = OpenAIEmbeddings(
-            openai_api_key=settings.OPENAI_API_KEY,
-            model=settings.EMBEDDING_MODEL
+        # Chunk embeddings are cached on disk by content hash, so rebuilds
+        # only pay for text that hasn't been embedded before
+        self.embeddings = CacheBackedEmbeddings.from_bytes_store(
+            OpenAIEmbeddings(
+                openai_api_key=settings.OPENAI_API_KEY,
+                model=settings.EMBEDDING_MODEL,
+                http_client=shared_sync_http,
+                http_async_client=shared_http
+            ),
+            LocalFileStore(settings.EMBEDDING_CACHE_PATH),
+            namespace=settings.EMBEDDING_MODEL,
+            key_encoder="sha256"
         )
         # self.embeddings = HuggingFaceEmbeddings(model_name="all-MiniLM-L6-v2")
 
         self.vector_store: Optional[FAISS] = None
+        # document_id -> faiss ids of its chunks in vector_store, so deletes skip a full scan
+        self._document_ids: Dict[str, Set[int]] = {}
+        # Recent query embeddings: query -> (expires_at, vector), least recently used first
+        self._query_embeddings: "OrderedDict[str, tuple]" = OrderedDict()
+        self._query_embeddings_lock = threading.Lock()
+        # Set while vector_store.index has read-only inverted lists mapped from index.faiss
+        self._index_mapped = False
+        # Index changes are saved by a background flusher after a quiet period
+        self._dirty = asyncio.Event()
+        self._write_lock = asyncio.Lock()
+        # faiss releases the GIL while searching, so searches in worker threads
+        # must not overlap an index modification or swap
+        self._index_lock = _ReadWriteLock()
+        self._flush_task: Optional[asyncio.Task] = None
+        self._rebuild_task: Optional[asyncio.Task] = None
+        # Adds and removes made while a rebuild runs, as (function, args), replayed
+        # onto the new store before it goes live
+        self._pending_changes: Optional[List[tuple]] = None
         self.vector_store_path = Path(settings.VECTOR_STORE_PATH)
         self.vector_store_path.mkdir(parents=True, exist_ok=True)
     
 
     async def initialize_vector_store(self):
         try:
-            # Try to initialize with minimal data
-            self.vector_store = FAISS.from_texts(
-                ["Hello, world"],  # Minimal initialization text
-                self.embeddings
-            )
-            logger.info("Vector store initialized")
+            if (self.vector_store_path / "index.faiss").exists():
+                store = await asyncio.to_thread(self._load_store)
+                if _is_id_mapped(store.index) and store.index.is_trained:
+                    self._document_ids = await asyncio.to_thread(_ids_by_document, store)
+                    self.vector_store = store
+                    logger.info("Loaded existing vector store")
+                else:
+                    # Older indexes use positional ids and lack document_id metadata,
+                    # so ids can't be added or removed, or are int8 stores left untrained;
+                    # drop the memory map before the rebuild overwrites the file
+                    del store
+                    logger.warning("Saved vector store predates ID-mapped indexes; rebuilding")
+                    await self.rebuild_vector_store()
+            else:
+                # Index whatever the knowledge base already holds (a new volume or a
+                # deleted index file); an empty one gets an empty ID-mapped index
+                await self.rebuild_vector_store()
+                logger.info("Vector store initialized")
         except Exception as e:
             logger.warning(f"Failed to initialize vector store: {e}")
             # Create a mock vector store
@@ -65,96 +237,305 @@ class VectorService:
                     return [0.0] * 384
             
             self.embeddings = MockEmbeddings()
+            self._query_embeddings.clear()
+        
+        self._flush_task = asyncio.create_task(self._flusher())
+    
+    async def close(self):
+        """Stop background tasks, saving any unsaved changes"""
+        if self._rebuild_task:
+            self._rebuild_task.cancel()
+            try:
+                await self._rebuild_task
+            except asyncio.CancelledError:
+                pass
+            self._rebuild_task = None
+        
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        
+        if self._dirty.is_set():
+            self._dirty.clear()
+            await self._save()
+    
+    async def _save(self):
+        """Write the index and docstore to disk without blocking the event loop"""
+        async with self._write_lock:
+            if self.vector_store:
+                await asyncio.to_thread(self.vector_store.save_local, str(self.vector_store_path))
+    
+    async def _flusher(self):
+        """Save the store VECTOR_STORE_SAVE_DELAY seconds after the first unsaved change"""
+        while True:
+            await self._dirty.wait()
+            # Let a burst of uploads or deletes coalesce into one save
+            await asyncio.sleep(settings.VECTOR_STORE_SAVE_DELAY)
+            self._dirty.clear()
+            try:
+                await self._save()
+            except Exception as e:
+                logger.error(f"Failed to save vector store: {e}")
+                self._dirty.set()
 
 
-    async def initialize_vector_store_(self):
-        """Initialize or load existing vector store"""
-        try:
-            # Try to load existing vector store
-            if (self.vector_store_path / "index.faiss").exists():
-                self.vector_store = FAISS.load_local(
-                    str(self.vector_store_path),
-                    self.embeddings
-                )
-                logger.info("Loaded existing vector store")
-            else:
-                # Create new vector store from database
-                await self.rebuild_vector_store()
-                
-        except Exception as e:
-            logger.error(f"Failed to initialize vector store: {e}")
-            # Create empty vector store as fallback
-            self.vector_store = FAISS.from_texts(
-                texts=[""],
-                embedding=self.embeddings
-            )
+    def _load_store(self) -> FAISS:
+        """Load the saved store, memory-mapping an IVF index's inverted lists.
+        
+        faiss only maps IVF inverted lists; flat and scalar-quantizer indexes
+        are read fully into memory and stay writable.
+        """
+        index = _read_index(
+            self.vector_store_path / "index.faiss",
+            faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY
+        )
+        with open(self.vector_store_path / "index.pkl", "rb") as f:
+            docstore, index_to_docstore_id = pickle.load(f)
+        
+        self._index_mapped = faiss.try_extract_index_ivf(index) is not None
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=docstore,
+            index_to_docstore_id=index_to_docstore_id
+        )
+    
+    def _make_writable(self):
+        """Replace a memory-mapped index with an in-memory copy before modifying it"""
+        if self._index_mapped:
+            self.vector_store.index = _read_index(self.vector_store_path / "index.faiss")
+            self._index_mapped = False
     
+    async def _embed_texts(self, texts: List[str]) -> List[List[float]]:
+        """Embed texts in max-size batches, running the batches concurrently"""
+        batch_size = settings.EMBEDDING_BATCH_SIZE
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+
+        results = await asyncio.gather(*[
+            asyncio.to_thread(self.embeddings.embed_documents, batch)
+            for batch in batches
+        ])
+        return [vector for batch_vectors in results for vector in batch_vectors]
+
+    def _build_index(self, vectors: np.ndarray, ids: np.ndarray) -> faiss.Index:
+        """Pick an index sized to the corpus and load the vectors under their stable ids"""
+        count, dim = vectors.shape
+
+        # Both index types accept explicit ids and support remove_ids
+        if count >= settings.VECTOR_INDEX_IVFPQ_MIN_SIZE:
+            index = faiss.index_factory(dim, settings.VECTOR_INDEX_IVFPQ_FACTORY)
+            index.train(vectors)
+            index.nprobe = settings.VECTOR_INDEX_NPROBE
+        else:
+            index = self._flat_index(dim, count)
+            if not index.is_trained:
+                index.train(vectors)
+
+        index.add_with_ids(vectors, ids)
+        return index
+
+    def _flat_index(self, dim: int, count: int = 0) -> faiss.Index:
+        """Exhaustive ID-mapped index for count vectors, storing them at VECTOR_QUANTIZATION precision"""
+        quantization = settings.VECTOR_QUANTIZATION
+        if quantization == "int8" and count < settings.VECTOR_INT8_MIN_TRAIN_SIZE:
+            # int8 learns its value ranges from training vectors, which a
+            # small corpus can't represent; hold fp16 until a rebuild has enough
+            quantization = "fp16"
+        qtype = SCALAR_QUANTIZERS.get(quantization)
+        if qtype is None:
+            return faiss.IndexIDMap2(faiss.IndexFlatL2(dim))
+        return faiss.IndexIDMap2(faiss.IndexScalarQuantizer(dim, qtype, faiss.METRIC_L2))
+
+    def _make_store(self, index: faiss.Index, documents: Dict[int, tuple]) -> FAISS:
+        """Wrap an ID-mapped index; documents maps faiss id -> (chunk id, Document)"""
+        return FAISS(
+            embedding_function=self.embeddings,
+            index=index,
+            docstore=InMemoryDocstore({
+                chunk_id: document for chunk_id, document in documents.values()
+            }),
+            index_to_docstore_id={
+                faiss_id: chunk_id for faiss_id, (chunk_id, _) in documents.items()
+            }
+        )
+
+    async def _empty_store(self) -> FAISS:
+        """Create a store with no vectors, sized to the embedding model"""
+        probe = await asyncio.to_thread(self.embeddings.embed_query, "Hello, world")
+        return self._make_store(self._flat_index(len(probe)), {})
+
+    async def _embed_chunks(self, chunks: List[Dict[str, Any]]):
+        """Embed knowledge base chunks, returning their vectors, faiss ids and documents"""
+        texts = [chunk["content"] for chunk in chunks]
+        vectors = await self._embed_texts(texts)
+
+        documents = {}
+        for chunk, text in zip(chunks, texts):
+            chunk_id = str(chunk["_id"])
+            metadata = {**chunk["metadata"], "document_id": chunk["document_id"]}
+            documents[_faiss_id(chunk_id)] = (chunk_id, Document(page_content=text, metadata=metadata))
+
+        ids = np.fromiter(documents.keys(), dtype=np.int64, count=len(documents))
+        return np.asarray(vectors, dtype=np.float32), ids, documents
+
     async def rebuild_vector_store(self):
         """Rebuild vector store from database"""
         try:
-            database = await get_database()
+            database = get_database()
+            
+            # Incremental adds and removes keep landing in the live store while the
+            # new one is built; record them so the new store can catch up
+            self._pending_changes = []
             
             # Get all chunks from knowledge base
-            chunks_cursor = database.knowledge_base.find({})
+            chunks_cursor = database.knowledge_base.find({}, CHUNK_PROJECTION)
             chunks = await chunks_cursor.to_list(length=None)
             
             if chunks:
-                texts = [chunk["content"] for chunk in chunks]
-                metadatas = [chunk["metadata"] for chunk in chunks]
-                
                 # Create FAISS vector store
-                self.vector_store = FAISS.from_texts(
-                    texts=texts,
-                    embedding=self.embeddings,
-                    metadatas=metadatas
-                )
-                
-                # Save vector store
-                self.vector_store.save_local(str(self.vector_store_path))
-                
-                logger.info(f"Vector store rebuilt with {len(chunks)} chunks")
+                vectors, ids, documents = await self._embed_chunks(chunks)
+                index = await asyncio.to_thread(self._build_index, vectors, ids)
+                store = self._make_store(index, documents)
             else:
                 # Create empty vector store
-                self.vector_store = FAISS.from_texts(
-                    texts=[""],
-                    embedding=self.embeddings
-                )
-                logger.info("Created empty vector store")
+                store = await self._empty_store()
+            document_ids = await asyncio.to_thread(_ids_by_document, store)
+            
+            async with self._write_lock:
+                changes, self._pending_changes = self._pending_changes, None
+                await asyncio.to_thread(self._swap_store, store, document_ids, changes)
+            
+            # Save vector store
+            await self._save()
+            
+            logger.info(f"Vector store rebuilt with {len(chunks)} chunks")
                 
         except Exception as e:
             logger.error(f"Failed to rebuild vector store: {e}")
             raise
+        finally:
+            # Stop recording if the rebuild failed or was cancelled before the swap
+            self._pending_changes = None
+    
+    def _swap_store(self, store: FAISS, document_ids: Dict[str, Set[int]], changes: List[tuple]):
+        """Replay changes made during the rebuild onto a new store and make it live; runs in a worker thread"""
+        for change, args in changes:
+            change(store, document_ids, *args)
+        
+        with self._index_lock.write():
+            self.vector_store = store
+            self._document_ids = document_ids
+            self._index_mapped = False
+    
+    def _needs_rebuild(self) -> bool:
+        """Whether an exhaustive store has reached the IVFPQ size, or the int8 training size while on fp16"""
+        index = self.vector_store.index
+        if faiss.try_extract_index_ivf(index) is not None:
+            return False
+        if index.ntotal >= settings.VECTOR_INDEX_IVFPQ_MIN_SIZE:
+            return True
+        return (
+            settings.VECTOR_QUANTIZATION == "int8"
+            and index.ntotal >= settings.VECTOR_INT8_MIN_TRAIN_SIZE
+            and not _is_int8(index)
+        )
+    
+    def _clear_rebuild_task(self, task: asyncio.Task):
+        """Forget a finished background rebuild so a later add can start another"""
+        if self._rebuild_task is task:
+            self._rebuild_task = None
+    
+    async def _rebuild_in_background(self):
+        """Rebuild without failing the caller; the current store keeps serving meanwhile"""
+        try:
+            await self.rebuild_vector_store()
+        except Exception:
+            pass  # Logged by rebuild_vector_store; the next add retries
     
     async def add_document_chunks(self, document_id: str):
         """Add chunks from a specific document to vector store"""
         try:
-            database = await get_database()
+            database = get_database()
             
             # Get chunks for this document
-            chunks_cursor = database.knowledge_base.find({"document_id": document_id})
+            chunks_cursor = database.knowledge_base.find({"document_id": document_id}, CHUNK_PROJECTION)
             chunks = await chunks_cursor.to_list(length=None)
             
             if chunks and self.vector_store:
-                texts = [chunk["content"] for chunk in chunks]
-                metadatas = [chunk["metadata"] for chunk in chunks]
+                vectors, ids, documents = await self._embed_chunks(chunks)
                 
-                # Add to existing vector store
-                self.vector_store.add_texts(texts, metadatas)
+                # Add to existing vector store under the chunks' stable ids
+                async with self._write_lock:
+                    added = await asyncio.to_thread(self._add_to_index, vectors, ids, documents)
+                    if self._pending_changes is not None:
+                        self._pending_changes.append((_add_to_store, (vectors, ids, documents)))
                 
-                # Save updated vector store
-                self.vector_store.save_local(str(self.vector_store_path))
+                if added:
+                    # Saved later by the flusher, batched with other changes
+                    self._dirty.set()
                 
-                logger.info(f"Added {len(chunks)} chunks to vector store")
+                logger.info(f"Added {added} of {len(chunks)} chunks to vector store")
+                
+                # Crossing a size threshold switches the store to IVFPQ, or from
+                # fp16 to an int8 quantizer trained on the whole corpus
+                if self._needs_rebuild() and not self._rebuild_task:
+                    self._rebuild_task = asyncio.create_task(self._rebuild_in_background())
+                    self._rebuild_task.add_done_callback(self._clear_rebuild_task)
                 
         except Exception as e:
             logger.error(f"Failed to add document chunks to vector store: {e}")
     
+    def _add_to_index(self, vectors: np.ndarray, ids: np.ndarray, documents: Dict[int, tuple]) -> int:
+        """Add embedded chunks to the live store; runs in a worker thread"""
+        with self._index_lock.write():
+            self._make_writable()
+            return _add_to_store(self.vector_store, self._document_ids, vectors, ids, documents)
+    
+    def _remove_from_index(self, document_id: str) -> int:
+        """Remove a document's chunks from the live store; runs in a worker thread"""
+        with self._index_lock.write():
+            if document_id not in self._document_ids:
+                return 0
+            self._make_writable()
+            return _remove_from_store(self.vector_store, self._document_ids, document_id)
+    
     async def remove_document_chunks(self, document_id: str):
         """Remove chunks from a specific document from vector store"""
-        # For now, we'll rebuild the entire vector store
-        # FAISS doesn't have built-in delete functionality
-        await self.rebuild_vector_store()
-        logger.info(f"Rebuilt vector store after removing document: {document_id}")
+        if not self.vector_store:
+            return
+        
+        # Drop the document's vectors by id; nothing is re-embedded
+        async with self._write_lock:
+            removed = await asyncio.to_thread(self._remove_from_index, document_id)
+            if self._pending_changes is not None:
+                self._pending_changes.append((_remove_from_store, (document_id,)))
+        if not removed:
+            return
+        
+        self._dirty.set()
+        logger.info(f"Removed {removed} chunks from vector store for document: {document_id}")
+    
+    def embed_query(self, query: str) -> List[float]:
+        """Embed a query string, reusing recent results for repeated queries"""
+        now = time.monotonic()
+        with self._query_embeddings_lock:
+            cached = self._query_embeddings.get(query)
+            if cached and cached[0] > now:
+                self._query_embeddings.move_to_end(query)
+                return cached[1]
+        
+        vector = self.embeddings.embed_query(query)
+        
+        with self._query_embeddings_lock:
+            self._query_embeddings[query] = (now + settings.QUERY_EMBEDDING_CACHE_TTL, vector)
+            self._query_embeddings.move_to_end(query)
+            while len(self._query_embeddings) > settings.QUERY_EMBEDDING_CACHE_SIZE:
+                self._query_embeddings.popitem(last=False)
+        return vector
     
     def search_similar(self, query: str, k: int = 5) -> List[Document]:
         """Search for similar documents"""
@@ -162,7 +543,9 @@ class VectorService:
             return []
         
         try:
-            docs = self.vector_store.similarity_search(query, k=k)
+            embedding = self.embed_query(query)
+            with self._index_lock.read():
+                docs = self.vector_store.similarity_search_by_vector(embedding, k=k)
             return docs
         except Exception as e:
             logger.error(f"Vector search failed: {e}")
@@ -174,11 +557,28 @@ class VectorService:
             return []
         
         try:
-            docs_with_scores = self.vector_store.similarity_search_with_score(query, k=k)
+            embedding = self.embed_query(query)
+            with self._index_lock.read():
+                docs_with_scores = self.vector_store.similarity_search_with_score_by_vector(
+                    embedding, k=k
+                )
             return docs_with_scores
         except Exception as e:
             logger.error(f"Vector search with scores failed: {e}")
             return []
+    
+    def search_similar_by_vector_with_scores(self, embedding: List[float], k: int = 5) -> List[tuple]:
+        """Search for similar documents by a precomputed query embedding"""
+        if not self.vector_store:
+            return []
+        
+        try:
+            with self._index_lock.read():
+                docs_with_scores = self.vector_store.similarity_search_with_score_by_vector(embedding, k=k)
+            return docs_with_scores
+        except Exception as e:
+            logger.error(f"Vector search by embedding failed: {e}")
+            return []
 
 # Global vector service instance
 vector_service = VectorService()
@@ -59,20 +59,27 @@ print('Creating database indexes...');
 
 // Documents collection indexes
 db.documents.createIndex({ "filename": 1 });
-db.documents.createIndex({ "upload_date": -1 });
+db.documents.createIndex({ "upload_date": -1, "status": 1 });
+db.documents.createIndex({ "upload_date": -1, "_id": -1 });
 db.documents.createIndex({ "status": 1 });
 db.documents.createIndex({ "content_type": 1 });
 db.documents.createIndex({ "metadata.category": 1 });
 db.documents.createIndex({ "metadata.tags": 1 });
+db.documents.createIndex(
+    { "content_hash": 1 },
+    {
+        name: "content_hash_unique",
+        unique: true,
+        partialFilterExpression: { "content_hash": { $type: "string" }, "status": "processed" }
+    }
+);
 
 // Queries collection indexes
-db.queries.createIndex({ "timestamp": -1 });
-db.queries.createIndex({ "question": "text" });
+db.queries.createIndex({ "timestamp": -1, "confidence": 1 });
 db.queries.createIndex({ "confidence": -1 });
 
 // Knowledge base indexes
-db.knowledge_base.createIndex({ "document_id": 1 });
-db.knowledge_base.createIndex({ "content": "text" });
+db.knowledge_base.createIndex({ "document_id": 1, "metadata.chunk_index": 1 });
 db.knowledge_base.createIndex({ "metadata.chunk_index": 1 });
 
 // Create admin user
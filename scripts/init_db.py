@@ -25,7 +25,7 @@ logger = logging.getLogger(__name__)
 
 async def create_sample_data():
     """Create sample documents and queries for testing"""
-    database = await get_database()
+    database = get_database()
     
     # Sample documents
     sample_docs = [
@@ -144,9 +144,9 @@ async def create_sample_data():
     
     try:
         # Insert sample data
-        await database.documents.insert_many(sample_docs)
-        await database.knowledge_base.insert_many(sample_chunks)
-        await database.queries.insert_many(sample_queries)
+        await database.documents.insert_many(sample_docs, ordered=False)
+        await database.knowledge_base.insert_many(sample_chunks, ordered=False)
+        await database.queries.insert_many(sample_queries, ordered=False)
         
         logger.info("✅ Sample data created successfully")
         logger.info(f"📄 {len(sample_docs)} documents")
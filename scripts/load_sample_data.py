@@ -8,7 +8,8 @@ Load sample documents into the AI Library for testing and demonstration.
 """
 
 import asyncio
-import aiofiles
+import hashlib
+import os
 from pathlib import Path
 import sys
 
@@ -24,13 +25,11 @@ import logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-async def create_sample_files():
-    """Create sample files for testing"""
-    sample_dir = Path("tests/fixtures/sample_documents")
-    sample_dir.mkdir(parents=True, exist_ok=True)
-    
-    # AI Guide content
-    ai_guide_content = """
+# Documents processed at once; keeps large sample sets from flooding the API
+SAMPLE_LOAD_CONCURRENCY = 8
+
+# Sample document contents, kept as bytes so they are written without encoding
+AI_GUIDE = b"""
 # Artificial Intelligence Implementation Guide
 
 ## Introduction
@@ -54,9 +53,8 @@ Artificial Intelligence (AI) is transforming businesses across industries. This
 - Scalability concerns
 - Integration with existing systems
 """
-    
-    # FastAPI Guide content
-    fastapi_guide_content = """
+
+FASTAPI_GUIDE = b"""
 # FastAPI Best Practices
 
 ## Overview
@@ -81,9 +79,8 @@ FastAPI is a modern, fast web framework for building APIs with Python 3.6+ based
 - Optimize database queries
 - Use connection pooling
 """
-    
-    # MongoDB Guide content
-    mongodb_guide_content = """
+
+MONGODB_GUIDE = b"""
 # MongoDB Optimization Guide
 
 ## Introduction
@@ -109,37 +106,62 @@ MongoDB is a popular NoSQL database. This guide covers optimization techniques.
 - Use appropriate read/write concerns
 - Implement proper sharding strategies
 """
+
+# Metadata for each sample above, validated once at import
+SAMPLE_METADATA = [
+    DocumentMetadata(
+        title="AI Implementation Guide",
+        author="Tech Team",
+        category="Documentation",
+        tags=["AI", "Machine Learning", "Implementation"]
+    ),
+    DocumentMetadata(
+        title="FastAPI Best Practices",
+        author="Development Team",
+        category="Development",
+        tags=["FastAPI", "Python", "API"]
+    ),
+    DocumentMetadata(
+        title="MongoDB Optimization Guide",
+        author="Database Team",
+        category="Database",
+        tags=["MongoDB", "Database", "Performance"]
+    )
+]
+
+def _write_samples_sync(items):
+    """Write every sample file in one pass; runs in a worker thread"""
+    for file_path, content in items:
+        # Raw descriptor writes; no buffered or text wrapper around the bytes
+        fd = os.open(file_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+        try:
+            view = memoryview(content)
+            while view:
+                view = view[os.write(fd, view):]
+        finally:
+            os.close(fd)
+
+async def create_sample_files():
+    """Create sample files for testing"""
+    sample_dir = Path("tests/fixtures/sample_documents")
+    sample_dir.mkdir(parents=True, exist_ok=True)
     
     sample_files = [
-        ("ai_implementation_guide.md", ai_guide_content, {
-            "title": "AI Implementation Guide",
-            "author": "Tech Team",
-            "category": "Documentation",
-            "tags": ["AI", "Machine Learning", "Implementation"]
-        }),
-        ("fastapi_best_practices.md", fastapi_guide_content, {
-            "title": "FastAPI Best Practices",
-            "author": "Development Team", 
-            "category": "Development",
-            "tags": ["FastAPI", "Python", "API"]
-        }),
-        ("mongodb_optimization.md", mongodb_guide_content, {
-            "title": "MongoDB Optimization Guide",
-            "author": "Database Team",
-            "category": "Database", 
-            "tags": ["MongoDB", "Database", "Performance"]
-        })
+        ("ai_implementation_guide.md", AI_GUIDE),
+        ("fastapi_best_practices.md", FASTAPI_GUIDE),
+        ("mongodb_optimization.md", MONGODB_GUIDE)
     ]
     
+    # One thread hop for all files instead of an open and a write per file
+    pairs = [(sample_dir / filename, content) for filename, content in sample_files]
+    await asyncio.to_thread(_write_samples_sync, pairs)
+    
     created_files = []
     
-    for filename, content, metadata in sample_files:
-        file_path = sample_dir / filename
-        
-        async with aiofiles.open(file_path, 'w') as f:
-            await f.write(content)
-        
-        created_files.append((str(file_path), filename, metadata))
+    for (file_path, content), (filename, _), metadata in zip(pairs, sample_files, SAMPLE_METADATA):
+        # Hashed like uploads, so a rerun finds the copies already loaded
+        content_hash = hashlib.sha256(content).hexdigest()
+        created_files.append((str(file_path), filename, metadata, content_hash))
         logger.info(f"✅ Created sample file: {filename}")
     
     return created_files
@@ -151,25 +173,41 @@ async def load_sample_documents():
     # Create sample files
     sample_files = await create_sample_files()
     
-    for file_path, filename, metadata_dict in sample_files:
-        try:
-            metadata = DocumentMetadata(**metadata_dict)
-            
-            # Process document
-            result = await document_service.process_document(
-                file_path=file_path,
-                filename=filename,
-                content_type="text/plain",
-                metadata=metadata
-            )
-            
-            logger.info(f"✅ Processed document: {result.filename}")
-            logger.info(f"   - ID: {result.id}")
-            logger.info(f"   - Chunks: {result.chunk_count}")
-            logger.info(f"   - Status: {result.status}")
-            
-        except Exception as e:
-            logger.error(f"❌ Failed to process {filename}: {e}")
+    # Bounded concurrency; each result is logged as soon as it lands
+    sem = asyncio.Semaphore(SAMPLE_LOAD_CONCURRENCY)
+    
+    async def _one(file_path, filename, metadata, content_hash):
+        async with sem:
+            try:
+                return filename, await document_service.process_document(
+                    file_path=file_path,
+                    filename=filename,
+                    content_type="text/plain",
+                    metadata=metadata,
+                    content_hash=content_hash
+                )
+            except Exception as e:
+                return filename, e
+    
+    tasks = [_one(*sample) for sample in sample_files]
+    
+    for fut in asyncio.as_completed(tasks):
+        filename, result = await fut
+        if isinstance(result, Exception):
+            logger.error(f"❌ Failed to process {filename}: {result}")
+            continue
+        
+        result, created = result
+        if not created:
+            logger.info(f"⏭️  Already loaded: {filename} (ID: {result.id})")
+            continue
+        
+        logger.info(f"✅ Processed document: {result.filename}")
+        logger.info(f"   - ID: {result.id}")
+        logger.info(f"   - Chunks: {result.chunk_count}")
+        logger.info(f"   - Status: {result.status}")
+    
+    await document_service.close()
 
 async def main():
     """Main function"""
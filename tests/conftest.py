@@ -3,8 +3,13 @@
 # ============================================================================
 
 import pytest
+import pytest_asyncio
 import asyncio
-from httpx import AsyncClient
+from contextlib import asynccontextmanager
+from asgi_lifespan import LifespanManager
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from httpx import ASGITransport, AsyncClient
 from motor.motor_asyncio import AsyncIOMotorClient
 import os
 from pathlib import Path
@@ -15,43 +20,92 @@ os.environ["DATABASE_NAME"] = "ai_library_test"
 os.environ["REDIS_URL"] = "redis://localhost:6379/1"
 os.environ["OPENAI_API_KEY"] = "test-key"
 
-from app.main import app
-from app.core.database import get_database
+from app.main import app, load_frontend
+from app.core.cache import CACHE_PREFIX
+from app.core.database import db, create_indexes
+from app.core.http import close_http_clients
+from app.api.endpoints.documents import document_service as app_document_service
+from app.services.document_service import DocumentService
+from app.services.stats_service import stats_service
+from app.services.vector_service import vector_service
+from tests.support.embeddings import FakeEmbeddings
 
-@pytest.fixture(scope="session")
-def event_loop():
-    """Create an instance of the default event loop for the test session."""
-    loop = asyncio.get_event_loop_policy().new_event_loop()
-    yield loop
-    loop.close()
+# Modules that bind get_database by name and so need patching individually
+DATABASE_MODULES = (
+    "app.core.database",
+    "app.services.document_service",
+    "app.services.qa_service",
+    "app.services.stats_service",
+    "app.services.vector_service",
+)
 
-@pytest.fixture
-async def client():
-    """Create test client"""
-    async with AsyncClient(app=app, base_url="http://test") as ac:
+@asynccontextmanager
+async def _test_lifespan(app):
+    """The app's startup and shutdown without Redis, OpenAI or the stats loop;
+    MongoDB is the session's motor_client"""
+    await create_indexes()
+    FastAPICache.init(InMemoryBackend(), prefix=CACHE_PREFIX)
+    await vector_service.initialize_vector_store()
+    load_frontend()
+    
+    yield
+    
+    await vector_service.close()
+    await app_document_service.close()
+    await close_http_clients()
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def _app_lifespan(motor_client, tmp_path_factory):
+    """Run the test startup and shutdown once for the whole session"""
+    with pytest.MonkeyPatch.context() as mp:
+        mp.setattr(app.router, "lifespan_context", _test_lifespan)
+        mp.setattr(vector_service, "embeddings", FakeEmbeddings())
+        mp.setattr(vector_service, "vector_store_path", tmp_path_factory.mktemp("vector_stores"))
+        # Query counters come from MongoDB rather than the Redis running totals
+        mp.setattr(stats_service, "get_query_counters", stats_service.count_queries)
+        async with LifespanManager(app):
+            yield
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def client(_app_lifespan):
+    """Create test client, shared by the whole session"""
+    async with AsyncClient(transport=ASGITransport(app=app), base_url="http://test") as ac:
         yield ac
 
-@pytest.fixture
-async def test_db():
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def motor_client():
+    """One pooled Mongo client for the whole session"""
+    client = AsyncIOMotorClient(os.environ["MONGODB_URL"], maxPoolSize=20, minPoolSize=4)
+
+    # get_database() reads this state, so every caller shares the pool
+    db.client = client
+    db.database = client[os.environ["DATABASE_NAME"]]
+    yield client
+    client.close()
+
+@pytest.fixture(autouse=True)
+def _patch_db(monkeypatch, motor_client):
+    """Point every get_database() binding at the test database"""
+    test_db = motor_client[os.environ["DATABASE_NAME"]]
+    for module in DATABASE_MODULES:
+        monkeypatch.setattr(f"{module}.get_database", lambda: test_db)
+
+@pytest_asyncio.fixture(scope="session", loop_scope="session")
+async def document_service(motor_client):
+    """Document service shared by the whole session"""
+    service = DocumentService()
+    yield service
+    await service.close()
+
+@pytest_asyncio.fixture(loop_scope="session")
+async def test_db(motor_client):
     """Create test database"""
-    database = await get_database()
+    database = motor_client[os.environ["DATABASE_NAME"]]
     yield database
     
-    # Cleanup after test
-    await database.drop_collection("documents")
-    await database.drop_collection("queries")
-    await database.drop_collection("knowledge_base")
-
-@pytest.fixture
-def sample_document():
-    """Sample document for testing"""
-    return {
-        "filename": "test_document.txt",
-        "content": "This is a test document for AI analysis.",
-        "content_type": "text/plain"
-    }
-
-@pytest.fixture
-def sample_pdf_content():
-    """Sample PDF content"""
-    return b"%PDF-1.4 test content"
\ No newline at end of file
+    # Cleanup after test; emptying keeps collections and their indexes
+    await asyncio.gather(
+        database.documents.delete_many({}),
+        database.queries.delete_many({}),
+        database.knowledge_base.delete_many({})
+    )
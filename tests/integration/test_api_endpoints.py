@@ -35,8 +35,8 @@ class TestDocumentEndpoints:
     @pytest.mark.asyncio
     async def test_upload_large_file(self, client: AsyncClient):
         """Test upload of file exceeding size limit"""
-        # Create large file content (>10MB)
-        large_content = "x" * (11 * 1024 * 1024)  # 11MB
+        # Create large file content (>10MB); one zero-filled buffer, no str encoding
+        large_content = bytes(11 * 1024 * 1024)  # 11MB
         
         files = {
             "file": ("large_file.txt", large_content, "text/plain")
@@ -68,8 +68,8 @@ class TestDocumentEndpoints:
         result = response.json()
         assert "documents" in result
         assert "total" in result
-        assert "page" in result
         assert "limit" in result
+        assert "has_next" in result
 
 class TestQueryEndpoints:
     
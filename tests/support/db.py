@@ -0,0 +1,13 @@
+# ============================================================================
+# tests/support/db.py - Database Seeding Helpers
+# ============================================================================
+
+from pymongo import InsertOne
+
+async def seed_documents(db, docs):
+    """Insert fixture documents in one unordered, unvalidated bulk write"""
+    await db.documents.bulk_write(
+        [InsertOne(doc) for doc in docs],
+        ordered=False,
+        bypass_document_validation=True
+    )
@@ -0,0 +1,18 @@
+# ============================================================================
+# tests/support/embeddings.py - Offline Embeddings
+# ============================================================================
+
+import hashlib
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+class FakeEmbeddings(Embeddings):
+    """Deterministic pseudo-random vectors seeded by the text"""
+
+    def embed_documents(self, texts):
+        return [self.embed_query(text) for text in texts]
+
+    def embed_query(self, text):
+        seed = int.from_bytes(hashlib.sha256(text.encode()).digest()[:4], "big")
+        return np.random.default_rng(seed).standard_normal(16).tolist()
@@ -3,40 +3,37 @@
 # ============================================================================
 
 import pytest
-from unittest.mock import Mock, patch
-import tempfile
+import io
+import hashlib
+from datetime import datetime, timedelta
 from pathlib import Path
+from fastapi import UploadFile
 
-from app.services.document_service import DocumentService
+from app.core.config import settings
+from app.services.document_service import FileTooLargeError
 from app.models.document import DocumentMetadata
+from tests.support.db import seed_documents
 
 class TestDocumentService:
     
-    @pytest.fixture
-    def document_service(self):
-        return DocumentService()
-    
-    @pytest.fixture
-    def temp_file(self):
-        """Create temporary file for testing"""
-        with tempfile.NamedTemporaryFile(mode='w', delete=False, suffix='.txt') as f:
-            f.write("This is test content for document processing.")
-            temp_path = f.name
-        
-        yield temp_path
-        
-        # Cleanup
-        Path(temp_path).unlink(missing_ok=True)
+    @pytest.fixture(scope="session")
+    def temp_file(self, tmp_path_factory):
+        """Create temporary file for testing; shared read-only, reaped by pytest"""
+        path = tmp_path_factory.mktemp("docs") / "test.txt"
+        path.write_bytes(b"This is test content for document processing.")
+        return str(path)
     
     @pytest.mark.asyncio
-    async def test_save_uploaded_file(self, document_service):
+    async def test_save_upload_stream(self, document_service):
         """Test file saving functionality"""
         test_content = b"Test file content"
         filename = "test_file.txt"
+        upload = UploadFile(file=io.BytesIO(test_content), filename=filename)
         
-        file_path = await document_service.save_uploaded_file(test_content, filename)
+        file_path, content_hash = await document_service.save_upload_stream(upload, filename)
         
         assert Path(file_path).exists()
+        assert content_hash == hashlib.sha256(test_content).hexdigest()
         assert filename in file_path
         
         # Read content to verify
@@ -48,6 +45,17 @@ class TestDocumentService:
         # Cleanup
         Path(file_path).unlink()
     
+    @pytest.mark.asyncio
+    async def test_save_upload_stream_rejects_oversized_file(self, document_service, monkeypatch):
+        """Test streaming upload aborts once MAX_FILE_SIZE is exceeded"""
+        monkeypatch.setattr(settings, "MAX_FILE_SIZE", 16)
+        upload = UploadFile(file=io.BytesIO(b"x" * 32), filename="big.txt")
+        
+        with pytest.raises(FileTooLargeError):
+            await document_service.save_upload_stream(upload, "big.txt")
+        
+        assert not list(Path(settings.UPLOAD_DIR).glob("*_big.txt"))
+    
     @pytest.mark.asyncio
     async def test_process_document_text(self, document_service, temp_file, test_db):
         """Test processing text document"""
@@ -57,19 +65,39 @@ class TestDocumentService:
             category="Testing"
         )
         
-        with patch('app.core.database.get_database', return_value=test_db):
-            result = await document_service.process_document(
-                temp_file,
-                "test.txt",
-                "text/plain",
-                metadata
-            )
+        result, created = await document_service.process_document(
+            temp_file,
+            "test.txt",
+            "text/plain",
+            metadata
+        )
         
+        assert created is True
         assert result.filename == "test.txt"
         assert result.content_type == "text/plain"
         assert result.status.value == "processed"
         assert result.chunk_count > 0
         assert result.metadata.title == "Test Document"
+        
+        stored = await test_db.documents.find_one({"_id": result.id})
+        assert "content_hash" not in stored
+    
+    @pytest.mark.asyncio
+    async def test_process_document_dedups_by_content_hash(self, document_service, temp_file, test_db):
+        """Test that identical content returns the existing document"""
+        content_hash = hashlib.sha256(Path(temp_file).read_bytes()).hexdigest()
+        
+        first, first_created = await document_service.process_document(
+            temp_file, "test.txt", "text/plain", None, content_hash
+        )
+        second, second_created = await document_service.process_document(
+            temp_file, "copy.txt", "text/plain", None, content_hash
+        )
+        
+        assert first_created is True
+        assert second_created is False
+        assert second.id == first.id
+        assert await test_db.documents.count_documents({}) == 1
     
     @pytest.mark.asyncio
     async def test_process_unsupported_file_type(self, document_service, temp_file):
@@ -97,8 +125,7 @@ class TestDocumentService:
         
         await test_db.documents.insert_one(doc_data)
         
-        with patch('app.core.database.get_database', return_value=test_db):
-            result = await document_service.get_document("test_doc_123")
+        result = await document_service.get_document("test_doc_123")
         
         assert result is not None
         assert result.id == "test_doc_123"
@@ -106,27 +133,41 @@ class TestDocumentService:
     
     @pytest.mark.asyncio
     async def test_list_documents(self, document_service, test_db):
-        """Test listing documents with pagination"""
-        # Insert test documents
+        """Test paging through documents by (upload_date, _id) cursor"""
+        # doc_1 and doc_2 share a timestamp and straddle the page boundary
+        base = datetime(2023, 1, 1)
+        offsets = [0, 2, 2, 3, 4]
         docs = [
             {
                 "_id": f"doc_{i}",
                 "filename": f"test_{i}.txt",
                 "content_type": "text/plain",
-                "upload_date": "2023-01-01T00:00:00",
+                "upload_date": base + timedelta(minutes=minutes),
                 "status": "processed",
                 "chunk_count": 1
             }
-            for i in range(5)
+            for i, minutes in enumerate(offsets)
         ]
         
-        await test_db.documents.insert_many(docs)
+        await seed_documents(test_db, docs)
+        
+        first = await document_service.list_documents(limit=3)
         
-        with patch('app.core.database.get_database', return_value=test_db):
-            result = await document_service.list_documents(page=1, limit=3)
+        assert [doc.id for doc in first["documents"]] == ["doc_4", "doc_3", "doc_2"]
+        assert first["total"] == 5
+        assert first["has_next"] is True
+        assert first["has_prev"] is False
+        assert first["next_before"] == base + timedelta(minutes=2)
+        assert first["next_before_id"] == "doc_2"
+        
+        second = await document_service.list_documents(
+            before=first["next_before"],
+            before_id=first["next_before_id"],
+            limit=3
+        )
         
-        assert len(result["documents"]) == 3
-        assert result["total"] == 5
-        assert result["page"] == 1
-        assert result["has_next"] is True
-        assert result["has_prev"] is False
\ No newline at end of file
+        assert [doc.id for doc in second["documents"]] == ["doc_1", "doc_0"]
+        assert second["has_next"] is False
+        assert second["has_prev"] is True
+        assert second["next_before"] is None
+        assert second["next_before_id"] is None
@@ -0,0 +1,50 @@
+# ============================================================================
+# tests/unit/test_query_cache.py - Semantic Query Cache Tests
+# ============================================================================
+
+import numpy as np
+
+from app.services.query_cache import SemanticLSHCache
+
+class TestSemanticLSHCache:
+
+    def test_near_duplicate_hit(self):
+        """Test that a nearly identical vector returns the cached value"""
+        cache = SemanticLSHCache(threshold=0.97)
+        vector = np.random.default_rng(1).standard_normal(64)
+
+        cache.set(vector, "answer")
+
+        assert cache.get(vector + 1e-4) == "answer"
+
+    def test_dissimilar_miss(self):
+        """Test that an unrelated vector misses"""
+        cache = SemanticLSHCache(threshold=0.97)
+        rng = np.random.default_rng(2)
+
+        cache.set(rng.standard_normal(64), "answer")
+
+        assert cache.get(rng.standard_normal(64)) is None
+
+    def test_scope_must_match(self):
+        """Test that hits are limited to the scope they were stored under"""
+        cache = SemanticLSHCache()
+        vector = np.random.default_rng(3).standard_normal(64)
+
+        cache.set(vector, "answer", scope=("docs", 5))
+
+        assert cache.get(vector, scope=("other", 5)) is None
+        assert cache.get(vector, scope=("docs", 5)) == "answer"
+
+    def test_evicts_least_recently_used(self):
+        """Test that the cache stays within max_entries"""
+        cache = SemanticLSHCache(max_entries=2)
+        rng = np.random.default_rng(4)
+        vectors = [rng.standard_normal(64) for _ in range(3)]
+
+        for i, vector in enumerate(vectors):
+            cache.set(vector, i)
+
+        assert len(cache) == 2
+        assert cache.get(vectors[0]) is None
+        assert cache.get(vectors[2]) == 2
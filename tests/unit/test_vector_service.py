@@ -0,0 +1,176 @@
+# ============================================================================
+# tests/unit/test_vector_service.py - Vector Service Tests
+# ============================================================================
+
+import asyncio
+
+import faiss
+import pytest
+import pytest_asyncio
+from langchain_community.vectorstores import FAISS
+
+from app.core.config import settings
+from app.services.vector_service import VectorService
+from tests.support.embeddings import FakeEmbeddings
+
+def _chunks(document_id, count):
+    return [
+        {
+            "_id": f"{document_id}_chunk_{i}",
+            "document_id": document_id,
+            "content": f"{document_id} chunk {i}",
+            "metadata": {"chunk_index": i}
+        }
+        for i in range(count)
+    ]
+
+class TestVectorService:
+
+    @pytest_asyncio.fixture
+    async def vector_service(self, tmp_path, monkeypatch, test_db):
+        """Service with fake embeddings and its own index directory"""
+        monkeypatch.setattr(settings, "VECTOR_STORE_PATH", str(tmp_path))
+        service = VectorService()
+        service.embeddings = FakeEmbeddings()
+        await service.initialize_vector_store()
+        yield service
+        await service.close()
+
+    def _search(self, service, text, k=10):
+        embedding = FakeEmbeddings().embed_query(text)
+        return service.search_similar_by_vector_with_scores(embedding, k=k)
+
+    @pytest.mark.asyncio
+    async def test_add_and_search(self, vector_service, test_db):
+        """Test that added chunks are searchable with their document id"""
+        await test_db.knowledge_base.insert_many(_chunks("doc_a", 3))
+
+        await vector_service.add_document_chunks("doc_a")
+
+        doc, _ = self._search(vector_service, "doc_a chunk 1", k=1)[0]
+        assert vector_service.vector_store.index.ntotal == 3
+        assert doc.page_content == "doc_a chunk 1"
+        assert doc.metadata["document_id"] == "doc_a"
+
+    @pytest.mark.asyncio
+    async def test_readd_is_noop(self, vector_service, test_db):
+        """Test that adding a document twice doesn't duplicate its vectors"""
+        await test_db.knowledge_base.insert_many(_chunks("doc_a", 3))
+
+        await vector_service.add_document_chunks("doc_a")
+        await vector_service.add_document_chunks("doc_a")
+
+        results = self._search(vector_service, "doc_a chunk 0")
+        assert vector_service.vector_store.index.ntotal == 3
+        assert len(results) == 3
+        assert len({doc.page_content for doc, _ in results}) == 3
+
+    @pytest.mark.asyncio
+    async def test_remove(self, vector_service, test_db):
+        """Test that removing a document drops only its chunks"""
+        await test_db.knowledge_base.insert_many(_chunks("doc_a", 3) + _chunks("doc_b", 2))
+        await vector_service.add_document_chunks("doc_a")
+        await vector_service.add_document_chunks("doc_b")
+
+        await vector_service.remove_document_chunks("doc_a")
+
+        results = self._search(vector_service, "doc_a chunk 0")
+        assert vector_service.vector_store.index.ntotal == 2
+        assert {doc.metadata["document_id"] for doc, _ in results} == {"doc_b"}
+
+    @pytest.mark.asyncio
+    async def test_outgrowing_flat_index_rebuilds_as_ivf(self, vector_service, test_db, monkeypatch):
+        """Test that crossing VECTOR_INDEX_IVFPQ_MIN_SIZE rebuilds into an IVF index"""
+        monkeypatch.setattr(settings, "VECTOR_INDEX_IVFPQ_MIN_SIZE", 5)
+        monkeypatch.setattr(settings, "VECTOR_INDEX_IVFPQ_FACTORY", "IVF2,Flat")
+        await test_db.knowledge_base.insert_many(_chunks("doc_a", 5))
+
+        await vector_service.add_document_chunks("doc_a")
+        await vector_service._rebuild_task
+
+        index = vector_service.vector_store.index
+        assert faiss.try_extract_index_ivf(index) is not None
+        assert index.ntotal == 5
+
+    @pytest.mark.asyncio
+    async def test_int8_waits_for_enough_training_vectors(self, vector_service, test_db, monkeypatch):
+        """Test that an int8 store holds fp16 until VECTOR_INT8_MIN_TRAIN_SIZE, then rebuilds as int8"""
+        monkeypatch.setattr(settings, "VECTOR_QUANTIZATION", "int8")
+        monkeypatch.setattr(settings, "VECTOR_INT8_MIN_TRAIN_SIZE", 5)
+        await test_db.knowledge_base.insert_many(_chunks("doc_a", 3) + _chunks("doc_b", 2))
+
+        await vector_service.add_document_chunks("doc_a")
+        sq = faiss.downcast_index(vector_service.vector_store.index.index)
+        assert sq.sq.qtype == faiss.ScalarQuantizer.QT_fp16
+        assert vector_service._rebuild_task is None
+
+        await vector_service.add_document_chunks("doc_b")
+        await vector_service._rebuild_task
+
+        sq = faiss.downcast_index(vector_service.vector_store.index.index)
+        assert sq.sq.qtype == faiss.ScalarQuantizer.QT_8bit
+        assert vector_service.vector_store.index.ntotal == 5
+
+    @pytest.mark.asyncio
+    async def test_changes_during_rebuild_reach_new_store(self, vector_service, test_db, monkeypatch):
+        """Test that adds and removes made while a rebuild runs survive the swap"""
+        await test_db.knowledge_base.insert_many(_chunks("doc_a", 3))
+        await vector_service.add_document_chunks("doc_a")
+
+        # Hold the rebuild after it has read the knowledge base
+        started, release = asyncio.Event(), asyncio.Event()
+        embed_chunks = vector_service._embed_chunks
+
+        async def held_embed_chunks(chunks):
+            if not started.is_set():
+                started.set()
+                await release.wait()
+            return await embed_chunks(chunks)
+
+        monkeypatch.setattr(vector_service, "_embed_chunks", held_embed_chunks)
+        rebuild = asyncio.create_task(vector_service.rebuild_vector_store())
+        await started.wait()
+
+        await vector_service.remove_document_chunks("doc_a")
+        await test_db.knowledge_base.insert_many(_chunks("doc_b", 2))
+        await vector_service.add_document_chunks("doc_b")
+        release.set()
+        await rebuild
+
+        results = self._search(vector_service, "doc_a chunk 0")
+        assert vector_service.vector_store.index.ntotal == 2
+        assert {doc.metadata["document_id"] for doc, _ in results} == {"doc_b"}
+
+    @pytest.mark.asyncio
+    async def test_startup_indexes_existing_chunks(self, tmp_path, monkeypatch, test_db):
+        """Test that a missing index file is rebuilt from the knowledge base"""
+        await test_db.knowledge_base.insert_many(_chunks("doc_a", 4))
+        monkeypatch.setattr(settings, "VECTOR_STORE_PATH", str(tmp_path))
+        service = VectorService()
+        service.embeddings = FakeEmbeddings()
+
+        await service.initialize_vector_store()
+        try:
+            assert service.vector_store.index.ntotal == 4
+            assert (tmp_path / "index.faiss").exists()
+        finally:
+            await service.close()
+
+    @pytest.mark.asyncio
+    async def test_startup_replaces_positional_index(self, tmp_path, monkeypatch, test_db):
+        """Test that an index saved without chunk ids is rebuilt and accepts adds"""
+        FAISS.from_texts(["Hello, world"], FakeEmbeddings()).save_local(str(tmp_path))
+        await test_db.knowledge_base.insert_many(_chunks("doc_a", 2) + _chunks("doc_b", 2))
+        monkeypatch.setattr(settings, "VECTOR_STORE_PATH", str(tmp_path))
+        service = VectorService()
+        service.embeddings = FakeEmbeddings()
+
+        await service.initialize_vector_store()
+        try:
+            assert isinstance(service.vector_store.index, faiss.IndexIDMap2)
+            assert service.vector_store.index.ntotal == 4
+
+            await service.remove_document_chunks("doc_a")
+            assert service.vector_store.index.ntotal == 2
+        finally:
+            await service.close()